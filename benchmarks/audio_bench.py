@@ -0,0 +1,132 @@
+"""
+Micro-benchmark: per-chunk cost of audio feature extraction.
+
+Compares the old AudioManager.calculate_rms (float64 copy + squares + math.sqrt)
+with the float32 paths in modules/audio_features.py: rms(), AudioFeatures.level()
+(RMS only, scratch buffer) and AudioFeatures.analyze() (RMS + peak + ZCR +
+smoothed dB) on the chunk sizes AIRA actually streams.
+
+Then checks the VoiceActivityGate on synthetic scenes: an 8 s utterance must
+stay open to the end (the noise floor must not learn the speaker), and a
+crowd-babble bed must not keep the gate open for good.
+
+Usage:
+    python benchmarks/audio_bench.py --iterations 20000
+"""
+import argparse
+import math
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from modules.audio_features import AudioFeatures, rms
+from modules.audio_sources import synth_speech
+from modules.vad import VoiceActivityGate
+
+# (name, samples per chunk)
+CHUNKS = [
+    ("mic 16 kHz x 1024", 1024),
+    ("speaker 24 kHz x 480", 480),
+    ("gemini reply ~8 KB", 4096),
+]
+
+
+def legacy_rms(data):
+    """The pre-AudioFeatures implementation, kept here for comparison."""
+    try:
+        if not data: return 0
+        shorts = np.frombuffer(data, dtype=np.int16)
+        if len(shorts) == 0: return 0
+        sum_squares = np.sum(shorts.astype(np.float64) ** 2)
+        return math.sqrt(sum_squares / len(shorts))
+    except:
+        return 0
+
+
+def gate_timeline(pcm, rate):
+    """Feeds pcm through a VoiceActivityGate in MIC_CHUNK chunks. Returns one bool per chunk (gate open)."""
+    gate = VoiceActivityGate(rate=rate, threshold_ratio=config.VAD_THRESHOLD_RATIO, min_rms=config.VAD_MIN_RMS,
+                             band_ratio=config.VAD_SPEECH_BAND_RATIO, hangover_chunks=config.VAD_HANGOVER_CHUNKS,
+                             preroll_chunks=config.VAD_PREROLL_CHUNKS, noise_window=config.VAD_NOISE_WINDOW_CHUNKS,
+                             max_open_chunks=config.VAD_MAX_OPEN_CHUNKS)
+    n = config.MIC_CHUNK
+    samples = np.clip(pcm, -32768, 32767).astype(np.int16)
+    open_flags = []
+    for start in range(0, len(samples) - n + 1, n):
+        gate.process(samples[start:start + n].tobytes())
+        open_flags.append(gate.is_speech)
+    return np.array(open_flags)
+
+
+def vad_scenes():
+    rate = config.MIC_RATE
+    chunk_s = config.MIC_CHUNK / rate
+    rng = np.random.default_rng(1)
+
+    def speech(seconds, seed):
+        return np.frombuffer(synth_speech(seconds * 1000, rate, seed=seed), dtype=np.int16).astype(np.float64)
+
+    def seconds_open(flags, t0, t1):
+        part = flags[int(t0 / chunk_s):int(t1 / chunk_s)]
+        return part.mean() * (t1 - t0)
+
+    print(f"\n{'VAD scene':<44}{'gate open':>12}")
+
+    # 2 s of room noise, one 8 s utterance without pauses, 2 s of room noise
+    quiet = rng.normal(0, 40, rate * 12)
+    pcm = quiet.copy()
+    pcm[rate * 2:rate * 10] += speech(8, seed=3)
+    flags = gate_timeline(pcm, rate)
+    held = seconds_open(flags, 2, 10)
+    print(f"{'8 s utterance in a quiet room':<44}{held:>9.1f} s of 8")
+    assert held > 7.5, "gate closed in the middle of a long utterance"
+
+    # 30 s of crowd babble (6 talkers, 800 RMS), a louder visitor from 24 to 26 s
+    babble = sum(speech(30, seed) for seed in range(5, 11))
+    babble *= 800 / np.sqrt(np.mean(babble * babble))
+    pcm = babble + rng.normal(0, 40, len(babble))
+    pcm[rate * 24:rate * 26] += speech(2, seed=3) * 2
+    flags = gate_timeline(pcm, rate)
+    bed = seconds_open(flags, 18, 24)
+    user = seconds_open(flags, 24, 26)
+    print(f"{'crowd babble, after it settled (18-24 s)':<44}{bed:>9.1f} s of 6")
+    print(f"{'visitor speaking over the babble':<44}{user:>9.1f} s of 2")
+    assert bed < 0.5, "gate stays open on crowd babble"
+    assert user > 1.0, "visitor not heard over the babble"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio feature extraction")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    features = AudioFeatures()
+
+    print(f"{'chunk':<24}{'legacy rms':>14}{'rms()':>14}{'level()':>14}{'analyze()':>14}")
+    for name, samples in CHUNKS:
+        data = (rng.standard_normal(samples) * 3000).astype(np.int16).tobytes()
+
+        # Same answer?
+        assert abs(legacy_rms(data) - features.analyze(data).rms) < 0.5
+
+        results = []
+        for fn in (lambda: legacy_rms(data), lambda: rms(data),
+                   lambda: features.level(data), lambda: features.analyze(data)):
+            seconds = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+            results.append(seconds / args.iterations * 1e6)
+
+        print(f"{name:<24}" + "".join(f"{us:>11.2f} us" for us in results))
+
+    print("\n(analyze() also returns peak, zero-crossing rate and smoothed dB)")
+
+    vad_scenes()
+
+
+if __name__ == "__main__":
+    main()
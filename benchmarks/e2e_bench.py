@@ -0,0 +1,124 @@
+"""
+End-to-end run of the full AIRARobot pipeline against the local replay session.
+
+No network, API key, sound card, camera or display needed: the mic is a WAV
+file (or synthetic utterances), the camera a video file (or synthetic frames),
+the speaker a silent real-time clock, and the Live API is ReplayConnector
+playing a scripted conversation. Reports turn latency (user stops talking ->
+first reply audio), per-loop latency, throughput and CPU use.
+
+Usage:
+    python benchmarks/e2e_bench.py --turns 6
+    python benchmarks/e2e_bench.py --script replies.json --mic user.wav --video cam.mp4 --json e2e.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Headless: SDL renders/plays into dummy drivers
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import config
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def run_bench(bot, turns, timeout):
+    run_task = asyncio.create_task(bot.run())
+
+    start = time.perf_counter()
+    cpu_start = cpu_seconds()
+    while time.perf_counter() - start < timeout:
+        if bot.connector.turns_played() >= turns:
+            break
+        if run_task.done():
+            break
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    cpu = cpu_seconds() - cpu_start
+
+    bot.running = False
+    await asyncio.sleep(0.2)
+    run_task.cancel()
+    try:
+        await run_task
+    except (asyncio.CancelledError, Exception):
+        pass
+    return elapsed, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", default=None, help="Replay script JSON (default: built-in demo)")
+    parser.add_argument("--mic", default=None, help="16-bit mono WAV at MIC_RATE (default: synthetic speech)")
+    parser.add_argument("--video", default=None, help="Camera video file (default: synthetic frames)")
+    parser.add_argument("--turns", type=int, default=6, help="Stop after this many replies")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Give up after N seconds")
+    parser.add_argument("--disconnect-after", type=float, default=0,
+                        help="Drop the replay session every N seconds (exercises reconnect/resume)")
+    parser.add_argument("--json", default=None, help="Write the full metrics snapshot here")
+    args = parser.parse_args()
+
+    # Replay backend, offline I/O, VAD on (turns start when the gate closes), metrics on
+    config.SESSION_BACKEND = "replay"
+    config.REPLAY_OFFLINE_IO = True
+    config.REPLAY_SCRIPT = args.script
+    config.REPLAY_MIC_FILE = args.mic
+    config.REPLAY_VIDEO_FILE = args.video
+    config.VAD_ENABLED = True
+    config.METRICS_ENABLED = True
+    config.METRICS_LOG_INTERVAL = 0
+    config.HARDWARE_SIMULATION = True
+    config.HEADLESS = True
+
+    from main import AIRARobot
+    from modules.session import ReplayConnector, load_script
+    script = dict(load_script(args.script))
+    if args.disconnect_after:
+        script["disconnect_after"] = args.disconnect_after
+    bot = AIRARobot(ReplayConnector(script, config.SPEAKER_RATE))
+    elapsed, cpu = asyncio.run(run_bench(bot, args.turns, args.timeout))
+
+    snapshot = bot.metrics.snapshot()
+    snapshot["boot"] = bot.boot.get_stats()
+    session = bot.connector.session
+    snapshot["replay"] = session.get_stats() if session is not None else {}
+    snapshot["replay"]["turns"] = bot.connector.turns_played()
+    snapshot["cpu"] = {"seconds": cpu, "percent": 100.0 * cpu / max(elapsed, 1e-9)}
+    if bot.audio:
+        bot.audio.close()
+    if bot.vision:
+        bot.vision.release()
+
+    print(f"\nReplay: {snapshot['replay'].get('turns', 0)} turns in {elapsed:.1f}s, "
+          f"CPU {cpu:.1f}s ({snapshot['cpu']['percent']:.0f}% of one core)")
+    print(f"Cold start -> online {snapshot['boot'].get('t_online_s', float('nan')):.2f}s")
+    net = bot.connection.get_stats()
+    print(f"Connects {net['connects']} (resumed {net['resumes']}, standby {net['standby_swaps']}), "
+          f"last downtime {net['last_downtime_s']:.2f}s, mic chunks replayed {net['mic_replayed']}")
+    print(f"{'histogram (ms)':<16} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, h in sorted(snapshot["histograms_ms"].items()):
+        if h.get("count", 0) == 0:
+            continue
+        print(f"{name:<16} {h['count']:>6} {h['p50']:>8.2f} {h['p95']:>8.2f} {h['p99']:>8.2f} {h['max']:>8.2f}")
+    for name, value in sorted(snapshot["counters"].items()):
+        print(f"{name:<24} {value:>10}  ({value / elapsed / 1024:.1f} KiB/s)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(snapshot, f, indent=2, default=str)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Echo suppression: how much of the robot's own voice still reaches the uplink.
+
+Simulates the speaker -> room -> mic path offline: a synthetic 24 kHz reply is
+played (the reference), a delayed, decaying copy of it is mixed into the
+16 kHz mic together with user speech (once on its own, once talking over the
+robot) and a little noise. Each mode in modules/echo.py processes the mic in
+MIC_CHUNK chunks, interleaved with speaker blocks like the real callbacks.
+
+Reports, per mode: echo-only chunks that would still be uploaded, user chunks
+kept (alone / during double-talk), ERLE and per-chunk cost on the mic thread.
+Fails if duck keeps no more double-talk chunks than half_duplex.
+
+Usage:
+    python benchmarks/echo_bench.py
+    python benchmarks/echo_bench.py --echo-gain 1.0 --path-ms 30 --modes half_duplex,nlms
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from modules.audio_features import rms
+from modules.audio_sources import synth_speech
+from modules.echo import MODES, EchoSuppressor
+
+
+def simulate(seconds, echo_gain, path_ms, noise, seed=0):
+    """Returns (speaker pcm int16, mic pcm int16 at the mic rate, echo mask, user mask)."""
+    mic_rate, spk_rate = config.MIC_RATE, config.SPEAKER_RATE
+    rng = np.random.default_rng(seed)
+
+    # Robot talks for the first two thirds, then silence
+    reply = np.frombuffer(synth_speech(seconds * 1000, spk_rate, seed=1), dtype=np.int16).copy()
+    reply[int(spk_rate * seconds * 2 / 3):] = 0
+    reference = np.interp(np.arange(seconds * mic_rate) * (spk_rate / mic_rate), np.arange(len(reply)), reply)
+
+    # Room: direct path + 10 ms of decaying reflections, after path_ms
+    ir = rng.normal(0, 0.1, mic_rate // 100) * np.exp(-np.arange(mic_rate // 100) / (mic_rate / 400))
+    ir[0] = 1.0
+    echo = np.convolve(reference, ir * echo_gain)[:len(reference)]
+    echo = np.concatenate([np.zeros(int(mic_rate * path_ms / 1000)), echo])[:len(reference)]
+
+    # User: once over the robot, once after it finished
+    user = np.frombuffer(synth_speech(seconds * 1000, mic_rate, seed=3), dtype=np.int16).astype(np.float64)
+    user_mask = np.zeros(len(user), dtype=bool)
+    user_mask[int(mic_rate * seconds * 0.4):int(mic_rate * seconds * 0.55)] = True
+    user_mask[int(mic_rate * seconds * 0.75):int(mic_rate * seconds * 0.9)] = True
+
+    mic = echo + user * user_mask + rng.normal(0, noise, len(user))
+    mic = np.clip(mic, -32768, 32767).astype(np.int16)
+    echo_mask = np.abs(echo) > 50
+    return reply, mic, echo_mask, user_mask
+
+
+def run_mode(mode, reply, mic, echo_mask, user_mask, path_ms, taps, step):
+    mic_rate, spk_rate = config.MIC_RATE, config.SPEAKER_RATE
+    echo = EchoSuppressor(mode, mic_rate, spk_rate, ref_rms=config.ECHO_REF_RMS, tail_ms=config.ECHO_TAIL_MS,
+                          duck_gain=config.ECHO_DUCK_GAIN, residual_rms=config.ECHO_RESIDUAL_RMS,
+                          taps=taps, step=step)
+    echo.set_delay(path_ms / 1000.0)
+
+    counts = {"echo_total": 0, "echo_sent": 0, "user_total": 0, "user_sent": 0, "dt_total": 0, "dt_sent": 0}
+    cost = 0.0
+    chunks = 0
+    spk_pos = 0
+    n = config.MIC_CHUNK
+    for start in range(0, len(mic) - n + 1, n):
+        # Speaker callbacks that ran before this mic chunk was delivered
+        while spk_pos * mic_rate < (start + n) * spk_rate:
+            echo.push_reference(reply[spk_pos:spk_pos + config.SPEAKER_CHUNK].tobytes())
+            spk_pos += config.SPEAKER_CHUNK
+
+        chunk = mic[start:start + n].tobytes()
+        t0 = time.perf_counter()
+        out, _ = echo.process(chunk, rms(chunk))
+        cost += time.perf_counter() - t0
+        chunks += 1
+
+        is_user = user_mask[start:start + n].mean() > 0.5
+        is_echo = echo_mask[start:start + n].mean() > 0.5
+        key = ("dt" if is_echo else "user") if is_user else ("echo" if is_echo else None)
+        if key:
+            counts[key + "_total"] += 1
+            counts[key + "_sent"] += out is not None
+
+    stats = echo.get_stats()
+    stats.update(counts)
+    stats["ms_per_chunk"] = cost / chunks * 1000.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--seconds", type=int, default=15)
+    parser.add_argument("--echo-gain", type=float, default=0.5, help="Echo level relative to the speaker signal")
+    parser.add_argument("--path-ms", type=float, default=20.0, help="Speaker -> mic delay (the suppressor is told this)")
+    parser.add_argument("--noise", type=float, default=30.0, help="Mic noise RMS")
+    parser.add_argument("--taps", type=int, default=config.ECHO_NLMS_TAPS)
+    parser.add_argument("--step", type=float, default=config.ECHO_NLMS_STEP)
+    args = parser.parse_args()
+
+    reply, mic, echo_mask, user_mask = simulate(args.seconds, args.echo_gain, args.path_ms, args.noise)
+    print(f"{args.seconds}s simulated, echo gain {args.echo_gain}, path {args.path_ms:.0f} ms, "
+          f"{config.MIC_CHUNK}-sample mic chunks")
+    print(f"{'mode':<12} {'echo sent':>10} {'user kept':>10} {'dbl-talk':>10} {'ERLE dB':>8} {'ms/chunk':>9}")
+    results = {}
+    for mode in args.modes.split(","):
+        s = results[mode] = run_mode(mode, reply, mic, echo_mask, user_mask, args.path_ms, args.taps, args.step)
+        print(f"{mode:<12} {s['echo_sent']:>4}/{s['echo_total']:<5} {s['user_sent']:>4}/{s['user_total']:<5} "
+              f"{s['dt_sent']:>4}/{s['dt_total']:<5} {s['erle_db']:>8.1f} {s['ms_per_chunk']:>9.3f}")
+
+    # Ducking exists to keep the user audible while the robot talks
+    if "duck" in results and "half_duplex" in results and results["half_duplex"]["dt_total"]:
+        assert results["duck"]["dt_sent"] > results["half_duplex"]["dt_sent"], \
+            "duck keeps no more double-talk than half_duplex"
+
+
+if __name__ == "__main__":
+    main()
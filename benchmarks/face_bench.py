@@ -0,0 +1,114 @@
+"""
+Headless RobotFace throughput + frame regression.
+
+Renders a scripted sequence of states (sleep, wake, idle with face tracking,
+talking with a lip-sync envelope, emotions) offscreen, as fast as possible,
+with a fixed timestep and a fake clock so every run produces identical frames.
+
+Reports update+draw throughput and per-frame cost. --checksums writes one MD5
+per frame (compare against a previous run with --compare), --dump saves PNGs.
+
+Usage:
+    python benchmarks/face_bench.py --frames 3000
+    python benchmarks/face_bench.py --frames 600 --checksums base.txt
+    python benchmarks/face_bench.py --frames 600 --compare base.txt --dump frames/
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from modules.face_engine import RobotFace
+
+# (seconds, state, emotion)
+TIMELINE = [
+    (1.0, "SLEEPING", "NEUTRAL"),
+    (1.0, "WAKING", "NEUTRAL"),
+    (3.0, "IDLE", "NEUTRAL"),
+    (2.0, "LISTENING", "NEUTRAL"),
+    (3.0, "TALKING", "HAPPY"),
+    (2.0, "IDLE", "LOVE"),
+    (1.0, "ERROR", "NEUTRAL"),
+]
+
+
+def scripted_inputs(t):
+    """(state, emotion, bot volume, face offset) at scripted time t (loops)."""
+    total = sum(d for d, _, _ in TIMELINE)
+    t %= total
+    for duration, state, emotion in TIMELINE:
+        if t < duration:
+            break
+        t -= duration
+    volume = 0.0
+    if state == "TALKING":
+        volume = config.LIPSYNC_FULL_SCALE * abs(math.sin(t * 9.0)) * (0.5 + 0.5 * math.sin(t * 2.3))
+    face = None
+    if state in ("IDLE", "LISTENING", "TALKING"):
+        face = (math.sin(t * 0.8), math.cos(t * 0.6) * 0.5)
+    return state, emotion, volume, face
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--fps", type=float, default=config.FPS, help="Simulated frame rate (timestep)")
+    parser.add_argument("--checksums", default=None, help="Write per-frame MD5s to this file")
+    parser.add_argument("--compare", default=None, help="Compare against a checksum file from an earlier run")
+    parser.add_argument("--dump", default=None, help="Save frames as PNG into this directory")
+    parser.add_argument("--dump-every", type=int, default=30, help="With --dump: save every Nth frame")
+    args = parser.parse_args()
+
+    random.seed(0)
+    sim_time = [0.0]
+    face = RobotFace(headless=True, clock=lambda: sim_time[0])
+    dt = 1.0 / args.fps
+
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+    need_sums = args.checksums or args.compare
+    sums = []
+
+    render_time = 0.0
+    for i in range(args.frames):
+        state, emotion, volume, offset = scripted_inputs(sim_time[0])
+        t0 = time.perf_counter()
+        face.update(dt, state, emotion, audio_volume=volume, face_offset=offset)
+        face.draw()
+        render_time += time.perf_counter() - t0
+        sim_time[0] += dt
+
+        if need_sums:
+            sums.append(face.checksum())
+        if args.dump and i % args.dump_every == 0:
+            face.save_frame(os.path.join(args.dump, f"frame_{i:05d}.png"))
+
+    print(f"Rendered {args.frames} frames at {face.width}x{face.height} (headless)")
+    print(f"  update+draw  {args.frames / render_time:8.0f} frames/s  "
+          f"({render_time / args.frames * 1000:.3f} ms/frame)")
+    print(f"  skipped      {face.frames_skipped} frames (nothing changed)")
+
+    if args.checksums:
+        with open(args.checksums, "w") as f:
+            f.write("\n".join(sums) + "\n")
+        print(f"Wrote {args.checksums}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            expected = f.read().split()
+        mismatches = [i for i, (a, b) in enumerate(zip(sums, expected)) if a != b]
+        if len(expected) != len(sums):
+            print(f"  frame count differs: {len(sums)} vs {len(expected)}")
+        if mismatches:
+            print(f"  MISMATCH in {len(mismatches)} frames (first: {mismatches[0]})")
+            sys.exit(1)
+        print("  all frames match")
+
+
+if __name__ == "__main__":
+    main()
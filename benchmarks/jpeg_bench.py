@@ -0,0 +1,63 @@
+"""
+JPEG encoder benchmark for the image uplink.
+
+Encodes camera-sized frames with every installed backend (opencv, turbojpeg,
+pil) at the output sizes / qualities we actually send, and reports ms per
+encode and JPEG size. Compares against the old path
+(cv2.imencode on the full frame + .tobytes()).
+
+Usage:
+    python benchmarks/jpeg_bench.py --video path/to/recording.mp4 --iterations 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.camera import FileCapture
+from modules.jpeg_encoder import JpegEncoder, available_backends
+
+MAX_SIDES = (640, 480, 320)
+QUALITIES = (50, 70)
+
+
+def time_it(fn, iterations):
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - start) / iterations * 1000.0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JPEG encoders")
+    parser.add_argument("--video", default=None, help="Recorded video file (default: synthetic frame)")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    capture = FileCapture(args.video, 640, 480)
+    _, frame = capture.read()
+    capture.release()
+
+    def legacy():
+        _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 50])
+        return buffer.tobytes()
+
+    ms, data = time_it(legacy, args.iterations)
+    print(f"{'backend':<12}{'max side':>10}{'quality':>9}{'ms/frame':>11}{'bytes':>9}")
+    print(f"{'legacy':<12}{640:>10}{50:>9}{ms:>11.2f}{len(data):>9}")
+
+    for backend in available_backends():
+        for max_side in MAX_SIDES:
+            for quality in QUALITIES:
+                encoder = JpegEncoder(backend, quality, max_side)
+                ms, jpeg = time_it(lambda: encoder.encode(frame), args.iterations)
+                print(f"{encoder.backend:<12}{max_side:>10}{quality:>9}{ms:>11.2f}{len(jpeg):>9}")
+
+
+if __name__ == "__main__":
+    main()
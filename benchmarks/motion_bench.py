@@ -0,0 +1,86 @@
+"""
+Motion load profile on the simulated servo/motor backend.
+
+Drives RobotBody.move_head at a given rate (like face tracking would) while
+the chocolate gesture runs, and reports servo bus statistics plus how much
+the servo writes delay the asyncio event loop.
+
+Usage:
+    python benchmarks/motion_bench.py --head-hz 30 --seconds 5 --timeline motion.csv
+"""
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from modules.hardware import RobotBody
+from modules.servo_sim import SimulatedServoKit, SimulatedMotorDriver
+
+
+async def head_load(body, hz, seconds):
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        t = time.perf_counter() - start
+        body.move_head(math.sin(t), math.cos(t * 0.5) * 0.5)
+        await asyncio.sleep(1.0 / hz)
+
+
+async def loop_lag(seconds, samples):
+    """Sleeps 5 ms repeatedly and records how late each wakeup is."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.005)
+        samples.append(time.perf_counter() - t0 - 0.005)
+
+
+async def main_async(args):
+    kit = SimulatedServoKit(slew_rate=args.slew, i2c_latency=args.i2c_ms / 1000.0)
+    body = RobotBody(kit=kit, motors=SimulatedMotorDriver())
+
+    lag = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        head_load(body, args.head_hz, args.seconds),
+        body.give_chocolate_sequence(),
+        body.move_wheels("forward", 1.5),
+        loop_lag(args.seconds, lag),
+    )
+    elapsed = time.perf_counter() - start
+
+    report = kit.report(elapsed)
+    lag.sort()
+    print(f"Head commands at {args.head_hz} Hz for {elapsed:.1f}s")
+    for key, value in report.items():
+        print(f"  {key:<18} {value:.3f}" if isinstance(value, float) else f"  {key:<18} {value}")
+    print(f"  loop lag p50 {lag[len(lag) // 2] * 1000:.2f} ms, p99 {lag[int(len(lag) * 0.99)] * 1000:.2f} ms")
+
+    # Tracking error: how far behind the commanded angle the pan servo really is
+    pan = [row for row in kit.timeline if row[2] == config.SERVO_HEAD_PAN]
+    behind = [abs(row[4] - row[3]) for row in pan]
+    if behind:
+        print(f"  pan servo lag at each write: avg {sum(behind) / len(behind):.2f} deg, max {max(behind):.2f} deg")
+
+    if args.timeline:
+        kit.dump_timeline(args.timeline)
+        print(f"Timeline written to {args.timeline}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile motion commands on the servo simulator")
+    parser.add_argument("--head-hz", type=float, default=30.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--slew", type=float, default=config.SIM_SERVO_SLEW_RATE, help="deg/s")
+    parser.add_argument("--i2c-ms", type=float, default=config.SIM_I2C_LATENCY * 1000.0)
+    parser.add_argument("--timeline", default=None, help="CSV file for the commanded/reached timeline")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Fuzz + throughput check for the streaming tag parser.
+
+Fuzz: random replies with emotion/action tags (plus decoy brackets) are cut
+into random-sized fragments and fed to TagParser. The events must match the
+tags in the reply no matter where the cuts fall, and each action must fire
+only once per turn.
+
+Throughput: MB/s of streamed text parsed, in realistic fragment sizes.
+
+Usage:
+    python benchmarks/tag_parser_bench.py --cases 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.tag_parser import TagParser, EMOTION_TAGS
+
+ACTIONS = ("GIVE_CHOCOLATE", "MOVE_FORWARD")
+WORDS = ("hajur", "namaste", "huss", "ni", "hai", "chocolate", "Aagaman", "ma", "timi", "ramro")
+DECOYS = ("[", "]", "[not a tag]", "[ACTION:", "[[", "[HAPPY", "laughs]")
+
+
+def make_parser():
+    parser = TagParser()
+    for emotion in EMOTION_TAGS:
+        parser.register_emotion(emotion)
+    for action in ACTIONS:
+        parser.register_action(action)
+    return parser
+
+
+def make_reply(rng):
+    """Returns (text, expected [(kind, name)])."""
+    parts = []
+    expected = []
+    fired = set()
+    for _ in range(rng.randint(5, 40)):
+        r = rng.random()
+        if r < 0.1:
+            name = rng.choice(EMOTION_TAGS)
+            tag = name.lower() if rng.random() < 0.3 else name
+            parts.append(f"[{tag}]")
+            expected.append(("emotion", name))
+        elif r < 0.18:
+            name = rng.choice(ACTIONS)
+            parts.append(f"[ACTION:{name}]")
+            if name not in fired:
+                fired.add(name)
+                expected.append(("action", name))
+        elif r < 0.22:
+            parts.append(rng.choice(DECOYS) + " ")
+        else:
+            parts.append(rng.choice(WORDS) + " ")
+    return "".join(parts), expected
+
+
+def split_randomly(rng, text):
+    pieces = []
+    pos = 0
+    while pos < len(text):
+        step = rng.randint(1, 12)
+        pieces.append(text[pos:pos + step])
+        pos += step
+    return pieces
+
+
+def fuzz(cases, seed):
+    rng = random.Random(seed)
+    parser = make_parser()
+    checked = 0
+    for _ in range(cases):
+        text, expected = make_reply(rng)
+
+        # Reference = the whole reply parsed in one piece
+        reference = [(e.kind, e.name) for e in parser.feed(text)]
+        parser.end_turn()
+
+        got = []
+        for piece in split_randomly(rng, text):
+            got.extend((e.kind, e.name) for e in parser.feed(piece))
+        parser.end_turn()
+
+        if got != reference:
+            raise AssertionError(f"Chunking changed the result:\n{text!r}\n{reference}\n{got}")
+        # Decoys can legitimately complete an emotion tag ("[HAPPY" + " ]"), so only
+        # actions are checked against the generator; everything is checked against chunking.
+        if [t for t in reference if t[0] == "action"] != [t for t in expected if t[0] == "action"]:
+            raise AssertionError(f"Action mismatch:\n{text!r}\n{expected}\n{reference}")
+        checked += 1
+    return checked
+
+
+def throughput(seconds, seed):
+    rng = random.Random(seed)
+    replies = [split_randomly(rng, make_reply(rng)[0]) for _ in range(200)]
+    parser = make_parser()
+
+    total = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for pieces in replies:
+            for piece in pieces:
+                parser.feed(piece)
+                total += len(piece)
+            parser.end_turn()
+    elapsed = time.perf_counter() - start
+    return total / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz + benchmark TagParser")
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Fuzz: {fuzz(args.cases, args.seed)} random replies OK (chunk boundaries don't matter)")
+    print(f"Throughput: {throughput(args.seconds, args.seed):.2f} MB/s of streamed text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Vision pipeline benchmark (no webcam needed).
+
+Replays a recorded video (or synthetic frames) through VisionSystem.track_face
+and reports per-stage latency, FPS, p50/p95/p99 and detection hit rate for
+every combination of detector / tracking mode / detection scales.
+
+Usage:
+    python benchmarks/vision_bench.py --video clips/expo_crowd.mp4
+    python benchmarks/vision_bench.py --frames 300 --detectors haar,lbp --modes detect,hybrid
+    python benchmarks/vision_bench.py --process   # detector in a worker process
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from modules.camera import FileCapture
+from modules.vision import VisionSystem
+
+STAGES = ("capture", "gray", "detect", "normalize")
+
+
+def percentiles(samples):
+    arr = np.asarray(samples) * 1000.0  # -> ms
+    return {
+        "mean": float(arr.mean()),
+        "p50": float(np.percentile(arr, 50)),
+        "p95": float(np.percentile(arr, 95)),
+        "p99": float(np.percentile(arr, 99)),
+    }
+
+
+def run_case(video, frames, detector, mode, scales, process=False):
+    # Settings are read from config when the VisionSystem is built
+    config.FACE_DETECT_PROCESS = process
+    config.FACE_DETECTOR = detector
+    config.FACE_TRACK_MODE = mode
+    config.FACE_DETECT_SCALES = scales
+
+    capture = FileCapture(video, config.CAMERA_WIDTH, config.CAMERA_HEIGHT)
+    vision = VisionSystem(capture=capture, threaded=False)
+
+    # Warm up (cascade allocations, first tracker template)
+    for _ in range(5):
+        vision.track_face()
+
+    stage_samples = {name: [] for name in STAGES}
+    totals = []
+    hits = 0
+    detections = 0
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        pos = vision.track_face()
+        totals.append(time.perf_counter() - t0)
+
+        if vision.last_stage is not None:  # None: no new frame, the stage timings are stale
+            for name in STAGES:
+                stage_samples[name].append(vision.timings[name])
+        if pos is not None:
+            hits += 1
+        if vision.last_stage == "detect":
+            detections += 1
+    elapsed = time.perf_counter() - start
+
+    worker = vision.get_detector_stats()
+    vision.release()
+
+    return {
+        "detector": detector + (" (process)" if process else ""),
+        "worker": worker,
+        "mode": mode,
+        "scales": list(scales),
+        "frames": frames,
+        "fps": frames / elapsed,
+        "hit_rate": hits / float(frames),
+        "detector_runs": detections,
+        "total_ms": percentiles(totals),
+        "stages_ms": {name: percentiles(stage_samples[name]) for name in STAGES},
+    }
+
+
+def print_result(r):
+    t = r["total_ms"]
+    print(f"\n=== {r['detector']} | {r['mode']} | scales={r['scales']} ===")
+    print(f"  {r['fps']:7.1f} FPS   hit rate {r['hit_rate'] * 100:5.1f}%   "
+          f"detector ran on {r['detector_runs']}/{r['frames']} frames")
+    print(f"  total      p50 {t['p50']:7.2f}  p95 {t['p95']:7.2f}  p99 {t['p99']:7.2f} ms")
+    for name in STAGES:
+        s = r["stages_ms"][name]
+        print(f"  {name:<10} p50 {s['p50']:7.2f}  p95 {s['p95']:7.2f}  p99 {s['p99']:7.2f} ms")
+    if r["worker"]:
+        w = r["worker"]
+        print(f"  worker     {w['requests']} requests, {w['timeouts']} timeouts, {w['restarts']} restarts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VisionSystem.track_face")
+    parser.add_argument("--video", default=None, help="Recorded video file (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--detectors", default="haar", help="Comma list: haar,lbp,yunet")
+    parser.add_argument("--modes", default="detect,hybrid", help="Comma list: detect,hybrid")
+    parser.add_argument("--scales", action="append", default=None,
+                        help="Pyramid levels, e.g. --scales 1.0 --scales 0.5,1.0")
+    parser.add_argument("--process", action="store_true", help="Run the detector in a worker process")
+    parser.add_argument("--json", default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    scale_sets = args.scales or ["1.0", "0.5,1.0"]
+    results = []
+    for detector in args.detectors.split(","):
+        for mode in args.modes.split(","):
+            for scale_set in scale_sets:
+                scales = tuple(float(s) for s in scale_set.split(","))
+                r = run_case(args.video, args.frames, detector.strip(), mode.strip(), scales, args.process)
+                print_result(r)
+                results.append(r)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,17 @@
 import os
 
 # --- SYSTEM SETTINGS ---
-FULLSCREEN = False  # Set to True for running on the Robot Screen
+FULLSCREEN = True   # Robot screen; False = window (desktop development)
 SCREEN_WIDTH = 854
 SCREEN_HEIGHT = 480
-FPS = 60
+HEADLESS = False    # Render the face offscreen (SDL dummy driver): CI, profiling on a server
+FPS = 60                # Max frame rate (animating)
+FPS_MIN = 10            # Idle frame rate when the face is perfectly still
 
 # --- PATHS ---
 ASSETS_DIR = "assets"
 SOUNDS_DIR = os.path.join(ASSETS_DIR, "sounds")
+MODELS_DIR = os.path.join(ASSETS_DIR, "models")
 
 # --- COLORS (R, G, B) ---
 COLOR_BG = (10, 12, 18)           # Deep Sci-Fi Blue/Black
@@ -37,4 +40,143 @@ MOUTH_THICKNESS = 8
 BLINK_INTERVAL_MIN = 2.0
 BLINK_INTERVAL_MAX = 6.0
 LERP_SPEED = 10.0       # How fast eyes move (Higher = Snappier)
-BREATH_SPEED = 2.0      # Speed of pupil pulsing
\ No newline at end of file
+BREATH_SPEED = 2.0      # Speed of pupil pulsing
+FACE_SETTLE_EPSILON = 0.5  # px / color units: closer than this to target counts as "still"
+
+# --- RENDERING ---
+FACE_SPRITE_CACHE_SIZE = 64  # Max cached eye sprites (one per color during fades)
+
+# --- SESSION ---
+SESSION_BACKEND = "gemini"  # "gemini" = Live API, "replay" = local scripted stand-in (no network/API key)
+REPLAY_SCRIPT = None        # JSON reply script for "replay" (None = built-in demo conversation)
+REPLAY_OFFLINE_IO = True    # "replay" also swaps mic/speaker/camera for files (headless box)
+REPLAY_MIC_FILE = None      # 16-bit mono WAV at MIC_RATE (None = synthetic utterances)
+REPLAY_VIDEO_FILE = None    # Recorded video for the camera (None = synthetic frames)
+
+# Reconnect
+RECONNECT_BASE_DELAY = 0.25  # First retry after ~this many seconds, doubling per failure...
+RECONNECT_MAX_DELAY = 10.0   # ...up to this
+RECONNECT_JITTER = 0.5       # Fraction of each delay that is randomised
+SESSION_RESUMPTION = True    # Resume the same conversation after a drop (Live API resumption handles)
+STANDBY_CONNECTION = False   # Keep a second session open to fail over instantly (extra quota, new context)
+STANDBY_MAX_AGE = 300        # Seconds before an unused standby is considered stale
+MIC_REPLAY_SECONDS = 3.0     # Mic audio kept during an outage and sent once reconnected (0 = drop it)
+
+# --- METRICS ---
+METRICS_ENABLED = False     # Per-loop latency histograms, counters and gauges
+METRICS_HISTORY = 512       # Samples kept per histogram
+METRICS_LOG_INTERVAL = 30   # Seconds between "[METRICS]" log lines (0 = off)
+METRICS_HTTP_PORT = 0       # e.g. 8765 -> curl http://127.0.0.1:8765/ (0 = off)
+
+
+# --- AUDIO SETTINGS ---
+MIC_RATE = 16000
+MIC_CHUNK = 1024          # Samples per mic callback (64 ms); smaller = lower latency, more wakeups
+MIC_QUEUE_MAX = 32        # Chunks held if the uplink falls behind (oldest dropped)
+SPEAKER_RATE = 24000      # Gemini Live output rate
+SPEAKER_CHUNK = 480       # 20 ms per playback callback
+JITTER_TARGET_MS = 120    # Audio queued before playback starts (absorbs network bursts)
+JITTER_MAX_MS = 20000     # Replies arrive faster than real time; oldest audio dropped beyond this
+SPEAKER_LATENCY_FALLBACK = 0.08  # Seconds, if the host API doesn't report DAC timing
+
+# Lip-Sync
+LIPSYNC_FULL_SCALE = 6000.0  # Speech RMS that opens the mouth fully
+LIPSYNC_RELEASE = 0.6        # Per 20 ms block decay (bridges gaps between words)
+
+# Voice Activity Detection (local gate before the mic uplink)
+VAD_ENABLED = True
+VAD_THRESHOLD_RATIO = 3.0     # Speech must be this many times above the noise floor
+VAD_MIN_RMS = 300.0           # ...and at least this loud
+VAD_SPEECH_BAND_RATIO = 0.5   # Min fraction of energy in 300-3400 Hz
+VAD_HANGOVER_CHUNKS = 8       # Keep sending ~0.5 s after speech stops (MIC_CHUNK-sized chunks)
+VAD_PREROLL_CHUNKS = 3        # Replay ~0.2 s before speech onset
+VAD_NOISE_WINDOW_CHUNKS = 47  # Noise floor >= quietest chunk of the last ~3 s with the gate closed
+VAD_MAX_OPEN_CHUNKS = 188     # Gate open ~12 s without a pause = noise bed (crowd babble), let the floor rise
+
+# Barge-in (user talks over the robot -> stop speaking, listen)
+BARGE_IN_LOCAL = True         # Detect it locally from mic energy (the server's "interrupted" is always honoured)
+BARGE_IN_RMS = 2000.0         # Mic RMS that counts as talking over the robot (raise if it interrupts itself)
+BARGE_IN_CHUNKS = 2           # Consecutive loud mic chunks needed (~128 ms)
+
+# Echo suppression (the robot hearing its own voice through the mic)
+# half_duplex is cheapest but the server can't hear the user while the robot talks,
+# so only the local barge-in detector can interrupt it. nlms keeps the user audible (~2 ms/chunk).
+ECHO_MODE = "half_duplex"     # "off", "half_duplex", "duck" or "nlms" (adaptive echo canceller)
+ECHO_REF_RMS = 150.0          # Speaker level that counts as the robot talking
+ECHO_TAIL_MS = 250            # Keep treating the mic as echo this long after playback stops (reverb)
+ECHO_DUCK_GAIN = 0.1          # "duck": mic gain while the robot talks (-20 dB)
+ECHO_RESIDUAL_RMS = 300.0     # "duck"/"nlms": while the robot talks, drop chunks quieter than this after processing
+ECHO_NLMS_TAPS = 512          # "nlms": echo path length covered (32 ms at MIC_RATE); cost grows with it
+ECHO_NLMS_STEP = 0.1          # "nlms": adaptation speed (too high diverges on speech)
+ECHO_PATH_MS = 5              # Speaker -> mic travel time on top of the stream latencies
+
+
+# --- VISION SETTINGS ---
+CAMERA_INDEX = 0
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_RING_SIZE = 4    # Preallocated frame buffers shared by tracking & uploads
+
+# Face Tracking
+# "detect" = Haar cascade on every frame
+# "hybrid" = cascade every N frames (or when lost), cheap template tracker in between
+FACE_TRACK_MODE = "hybrid"
+FACE_REDETECT_INTERVAL = 15   # Frames between full cascade runs
+FACE_ROI_PADDING = 0.5        # Search window around last box (fraction of box size)
+FACE_TRACK_TEMPLATE_SIZE = 32 # Tracker works on a template this many px wide
+FACE_TRACK_MIN_SCORE = 0.6    # Below this match score the target counts as lost
+VISION_LOOP_INTERVAL = 0.033 if FACE_TRACK_MODE == "hybrid" else 0.1
+
+# Face Detector
+# "haar"  = OpenCV built-in Haar cascade (default, no downloads)
+# "lbp"   = LBP cascade file (faster, slightly less accurate)
+# "yunet" = OpenCV DNN YuNet ONNX model (most accurate, needs OpenCV 4.5.4+)
+FACE_DETECTOR = "haar"
+FACE_DETECT_SCALES = (0.5, 1.0)  # Try half resolution first, full res only if nothing found
+FACE_MIN_SIZE = 40               # Ignore faces smaller than this (full-res px), 0 = no limit
+FACE_MAX_SIZE = 0                # 0 = no limit
+FACE_HAAR_MODEL = None           # None = OpenCV's built-in frontal face cascade
+FACE_LBP_MODEL = os.path.join(MODELS_DIR, "lbpcascade_frontalface_improved.xml")
+FACE_YUNET_MODEL = os.path.join(MODELS_DIR, "face_detection_yunet_2023mar.onnx")
+FACE_YUNET_SCORE = 0.8
+FACE_DETECT_PROCESS = False      # Run the detector in a worker process (shared-memory frames, spare core)
+FACE_WORKER_TIMEOUT = 1.0        # Seconds before a silent worker is killed and restarted
+FACE_WORKER_RESTART_DELAY = 2.0  # Min seconds between worker restarts
+
+# Image Uplink (camera frames sent to Gemini)
+IMAGE_UPLINK_MODE = "adaptive"    # "fixed" = every tick, "adaptive" = only when the scene changed
+IMAGE_UPLINK_INTERVAL = 1.0       # Seconds between uplink checks
+IMAGE_UPLINK_MAX_INTERVAL = 5.0   # Adaptive: send anyway after this long (keep-alive)
+IMAGE_UPLINK_HASH_THRESHOLD = 6   # Adaptive: min changed bits (of 64) in the perceptual hash
+IMAGE_UPLINK_FACE_CROP = True     # Crop around the tracked face when there is one
+IMAGE_UPLINK_CROP_SCALE = 3.0     # Crop size as a multiple of the face box (keeps shoulders/hands)
+IMAGE_UPLINK_MAX_SIDE = 480       # Longest side after downsizing (px)
+IMAGE_UPLINK_QUALITY = 50         # JPEG quality
+JPEG_BACKEND = "auto"             # "auto" (turbojpeg if installed), "turbojpeg", "opencv", "pil"
+
+
+# --- BODY / MOTION ---
+ACTION_QUEUE_MAX = 4   # Motions waiting behind the running one (extra tags are dropped)
+HARDWARE_SIMULATION = False  # No PCA9685 found -> use the timing-model simulator (benchmarks; its I2C sleeps block the caller)
+
+# PCA9685 Servo Channels (as wired, see wiring.md)
+SERVO_HEAD_PAN = 0
+SERVO_LEFT_ARM = 1
+SERVO_RIGHT_ARM = 2
+SERVO_HEAD_TILT = None  # No tilt servo wired; set its channel to enable vertical tracking
+HEAD_PAN_RANGE = 45    # Degrees either side of center
+HEAD_TILT_RANGE = 25
+
+# Head Tracking Controller
+HEAD_CONTROL_HZ = 20           # Servo update rate (one head write per tick at most)
+HEAD_FILTER_MIN_CUTOFF = 1.0   # 1-Euro filter: lower = smoother when still
+HEAD_FILTER_BETA = 0.05        # 1-Euro filter: higher = less lag when moving fast
+HEAD_DEAD_BAND = 0.08          # Ignore pointing errors smaller than this
+HEAD_GAIN = 1.5                # Turn speed per unit of error (1/s)
+HEAD_MAX_SPEED = 1.0           # Max head speed (range units per second)
+HEAD_MIN_STEP = 0.01           # Skip servo writes smaller than this
+HEAD_LOST_TIMEOUT = 2.0        # Seconds without a face before returning to center
+
+# Simulator Timing Model
+SIM_SERVO_SLEW_RATE = 300.0  # deg/s (SG90 ~ 0.1 s / 60 deg at 5 V)
+SIM_I2C_LATENCY = 0.0008     # Seconds per servo write on the I2C bus
@@ -2,11 +2,8 @@
 import asyncio
 import sys
 import os
-import re
 import time
 import pygame
-from google import genai
-from google.genai.types import LiveConnectConfig, Content, Part
 
 # Load Environment Variables
 from dotenv import load_dotenv
@@ -18,12 +15,18 @@ from modules.face_engine import RobotFace
 from modules.audio_manager import AudioManager
 from modules.vision import VisionSystem
 from modules.hardware import RobotBody
+from modules.vad import VoiceActivityGate
+from modules.uplink import ImageUplink
+from modules.tag_parser import TagParser, EMOTION_TAGS
+from modules.actions import ActionDispatcher
+from modules.head_tracker import HeadController
+from modules.metrics import Metrics
+from modules.camera import FileCapture
+from modules.session import GeminiConnector, ReplayConnector, load_script
+from modules.boot import BootTimer
+from modules.connection import ConnectionManager, Backoff
 
-# API Key Check
 API_KEY = os.getenv("GOOGLE_API_KEY")
-if not API_KEY:
-    print("ERROR: API Key not found in .env file")
-    sys.exit(1)
 
 MODEL_ID = "gemini-2.5-flash-native-audio-preview-12-2025"
 
@@ -84,11 +87,35 @@ SYSTEM_INSTRUCTION = (
 )
 
 class AIRARobot:
-    def __init__(self):
+    def __init__(self, connector=None):
+        # Offline replay: scripted session + file-backed mic/camera, no network or devices
+        self.replay = config.SESSION_BACKEND == "replay"
+        self.offline = self.replay and config.REPLAY_OFFLINE_IO
+        self.boot = BootTimer()
+
+        # Only the display is opened here, so the face can be on screen right away.
+        # Camera, audio devices, servos and the Live client are opened concurrently in run().
         self.face = RobotFace()
-        self.audio = AudioManager()
-        self.vision = VisionSystem()
-        self.body = RobotBody()
+        self.boot.mark("display")
+        self.audio = None
+        self.vision = None
+        self.uplink = None
+        self.body = None
+        self.head = None
+        self.dispatcher = ActionDispatcher(config.ACTION_QUEUE_MAX)
+        self.metrics = Metrics(config.METRICS_ENABLED, config.METRICS_HISTORY)
+        self.vad = None
+        if config.VAD_ENABLED:
+            self.vad = VoiceActivityGate(
+                rate=config.MIC_RATE,
+                threshold_ratio=config.VAD_THRESHOLD_RATIO,
+                min_rms=config.VAD_MIN_RMS,
+                band_ratio=config.VAD_SPEECH_BAND_RATIO,
+                hangover_chunks=config.VAD_HANGOVER_CHUNKS,
+                preroll_chunks=config.VAD_PREROLL_CHUNKS,
+                noise_window=config.VAD_NOISE_WINDOW_CHUNKS,
+                max_open_chunks=config.VAD_MAX_OPEN_CHUNKS
+            )
 
         self.state = "SLEEPING"
         self.emotion = "NEUTRAL"
@@ -97,29 +124,152 @@ class AIRARobot:
         # Shared Variables (Thread Safe)
         self.latest_face_pos = None  # (x, y)
 
-        self.last_error_time = 0
-        self.retry_delay = 5.0
+        self.setup_tags()
+        self.awaiting_reply_since = None  # Time the user stopped talking (VAD), until first reply audio
+        self.drop_reply = False  # User barged in: discard the rest of the current reply
+        self.reply_streaming = False  # Server is still sending the current reply (first audio -> turn_complete)
 
-        self.client = genai.Client(api_key=API_KEY, http_options={'api_version': 'v1alpha'})
+        # Where Live sessions come from (anything with an async connect() context manager).
+        # None -> built from config during boot (the SDK import alone takes a while on the Pi).
+        self.connector = connector
         self.session = None
+        self.outage_reported = False  # Error SFX already played for the current outage
+
+        # Reconnects: backoff, resumption, optional standby session, mic audio kept while offline
+        self.connection = ConnectionManager(
+            connector,
+            Backoff(config.RECONNECT_BASE_DELAY, config.RECONNECT_MAX_DELAY, config.RECONNECT_JITTER),
+            resumption=config.SESSION_RESUMPTION,
+            standby=config.STANDBY_CONNECTION,
+            standby_max_age=config.STANDBY_MAX_AGE,
+            mic_replay_chunks=int(config.MIC_REPLAY_SECONDS * config.MIC_RATE / config.MIC_CHUNK)
+        )
+
+    def create_connector(self):
+        if self.replay:
+            return ReplayConnector(load_script(config.REPLAY_SCRIPT), config.SPEAKER_RATE)
+        return GeminiConnector(API_KEY, MODEL_ID, SYSTEM_INSTRUCTION, config.SESSION_RESUMPTION)
+
+    def create_vision(self):
+        """Opens the camera and loads the face detector."""
+        if self.offline:
+            return VisionSystem(FileCapture(config.REPLAY_VIDEO_FILE, config.CAMERA_WIDTH,
+                                            config.CAMERA_HEIGHT, realtime=True))
+        return VisionSystem()
+
+    async def start_devices(self):
+        """
+        Opens audio, camera and servos at the same time, each on its own thread,
+        and starts the loops that need them as soon as each one is ready.
+        """
+        async def start_audio():
+            self.audio = await self.boot.run_in_thread("audio", AudioManager, self.offline, config.REPLAY_MIC_FILE)
+            # Mic chunks arrive from PortAudio's thread into this loop's queue
+            self.audio.attach_loop(asyncio.get_running_loop())
+            # Barge-in: the mic thread flushes playback itself, then tells us
+            self.audio.on_barge_in = lambda: self.handle_barge_in("local")
+            self.audio.on_silenced = lambda ms: self.metrics.observe("barge_in", ms)
+            # Mic uplink runs for the whole lifetime (buffers audio while the link is down)
+            self.tasks.append(asyncio.create_task(self.send_data_loop()))
+            if self.state == "SLEEPING":
+                self.state = "WAKING"
+            self.audio.play_sfx("wakeup")
+
+        async def start_vision():
+            self.vision = await self.boot.run_in_thread("vision", self.create_vision)
+            self.uplink = ImageUplink(self.vision)
+            # Start the Vision Processor (Background)
+            self.tasks.append(asyncio.create_task(self.vision_loop()))
+
+        async def start_body():
+            self.body = await self.boot.run_in_thread("body", RobotBody)
+            self.head = HeadController(self.body)
+            # Start the Head Controller (physical head follows the face)
+            self.tasks.append(asyncio.create_task(self.head.run(lambda: self.latest_face_pos)))
+
+        await asyncio.gather(start_audio(), start_vision(), start_body())
+        self.setup_metrics()
+        self.boot.mark("devices")
+
+    def setup_tags(self):
+        """Table of tags the model can emit. New actions only need an entry here."""
+        self.actions = {
+            # name: (priority, motion)  -> lower number = more urgent, preempts the rest
+            "GIVE_CHOCOLATE": (1, lambda: self.body.give_chocolate_sequence(self.vision)),
+            "MOVE_FORWARD": (2, lambda: self.body.move_wheels("forward", 1.5)),
+        }
+        self.tags = TagParser()
+        for emotion in EMOTION_TAGS:
+            self.tags.register_emotion(emotion)
+        for name in self.actions:
+            self.tags.register_action(name)
+
+    def setup_metrics(self):
+        """Gauges pulled from each subsystem when a metrics snapshot is taken."""
+        self.metrics.add_source("audio_out", self.audio.get_playback_stats)
+        self.metrics.add_source("mic", self.audio.get_mic_stats)
+        self.metrics.add_source("echo", self.audio.get_echo_stats)
+        self.metrics.add_source("image_uplink", self.uplink.get_stats)
+        self.metrics.add_source("actions", self.dispatcher.get_stats)
+        self.metrics.add_source("head", self.head.get_stats)
+        self.metrics.add_source("face", lambda: {"frames_skipped": self.face.frames_skipped})
+        self.metrics.add_source("boot", self.boot.get_stats)
+        self.metrics.add_source("connection", self.connection.get_stats)
+        if config.FACE_DETECT_PROCESS:
+            self.metrics.add_source("detector", self.vision.get_detector_stats)
+        if self.vad is not None:
+            self.metrics.add_source("vad", self.vad.get_stats)
+
+    def handle_barge_in(self, source):
+        """
+        The user talked over the robot: stop speaking now and listen.
+        source "local": our mic detector fired (playback already flushed on the mic thread);
+                        if the reply is still streaming, the rest of it is stale until the
+                        server notices too. Replies stream faster than real time, so it has
+                        often finished already: then the next audio is the answer to the user.
+        source "server": the Live API stopped generating; what follows is a new reply.
+        """
+        print(f">>> BARGE-IN ({source})")
+        if source == "server" and self.audio.is_playing():
+            self.audio.interrupt()
+        self.drop_reply = source == "local" and self.reply_streaming
+        self.reply_streaming = False
+        self.tags.end_turn()
+        if self.state in ["IDLE", "TALKING"]:
+            self.state = "LISTENING"
+        self.metrics.count(f"barge_in.{source}")
+
+    def trigger_action(self, name):
+        print(f">>> TRIGGER: {name}")
+        priority, motion = self.actions[name]
+        self.dispatcher.submit(name, motion, priority)
 
     async def face_drawing_loop(self):
         """
-        Runs at 60 FPS. ONLY Draws. NEVER does I/O (Camera/Network).
+        Runs at up to 60 FPS. ONLY Draws. NEVER does I/O (Camera/Network).
         This prevents the window from freezing.
+
+        Adaptive pacing: while the face is perfectly still (asleep, or all
+        animations converged) it only renders at config.FPS_MIN. Inputs are
+        still polled every max-rate tick, so blinks, talking or a moving face
+        bring it straight back to config.FPS.
         """
-        clock = pygame.time.Clock()
+        fast_interval = 1.0 / config.FPS
+        idle_interval = 1.0 / config.FPS_MIN
+        last_frame = time.perf_counter()
+        last_inputs = None
+
         while self.running:
-            dt = clock.tick(config.FPS) / 1000.0
+            loop_start = time.perf_counter()
 
             # 1. Pump Events (Keep Window Alive)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
 
-            # 2. Read Sensors (Non-Blocking reads)
-            bot_vol = self.audio.get_bot_volume()
-            user_vol = self.audio.get_user_volume()
+            # 2. Read Sensors (Non-Blocking reads; audio may still be booting)
+            bot_vol = self.audio.get_bot_volume() if self.audio else 0.0
+            user_vol = self.audio.get_user_volume() if self.audio else 0.0
             # We read the variable, we do NOT call the camera function here
             face_pos = self.latest_face_pos
 
@@ -134,12 +284,28 @@ class AIRARobot:
                 # If we are looking at a face, but it's quiet, and robot isn't talking yet...
                 # We are likely WAITING for a reply.
                 display_state = "THINKING"  # Eyes look up/right
-            # 4. Draw
-            self.face.update(dt, display_state, self.emotion, audio_volume=bot_vol, face_offset=face_pos)
-            self.face.draw()
 
-            # Yield to other async tasks
-            await asyncio.sleep(0.001)
+            # 4. Pace: full rate while anything changes, idle rate while still
+            inputs = (display_state, self.emotion, face_pos)
+            active = inputs != last_inputs or not self.face.is_settled(lookahead=idle_interval)
+            now = time.perf_counter()
+            frame_interval = fast_interval if active else idle_interval
+
+            if now - last_frame >= frame_interval:
+                # Waking from idle must not jump a whole idle frame in one step
+                dt = min(now - last_frame, fast_interval * 2 if active else idle_interval)
+                last_frame = now
+                last_inputs = inputs
+
+                # 5. Draw
+                self.face.update(dt, display_state, self.emotion, audio_volume=bot_vol, face_offset=face_pos)
+                self.face.draw()
+                self.metrics.observe("render", (time.perf_counter() - now) * 1000.0)
+
+            self.metrics.observe("loop.face", (time.perf_counter() - loop_start) * 1000.0)
+
+            # Yield to other async tasks until the next max-rate tick
+            await asyncio.sleep(max(0.001, last_frame + fast_interval - time.perf_counter()))
 
     async def vision_loop(self):
         """
@@ -149,66 +315,124 @@ class AIRARobot:
             if self.state in ["IDLE", "LISTENING", "TALKING"]:
                 # Run camera in a thread so it doesn't block the loop
                 # This returns (x, y) or None
+                t0 = time.perf_counter()
                 pos = await asyncio.to_thread(self.vision.track_face)
                 self.latest_face_pos = pos
+                self.metrics.observe("loop.vision", (time.perf_counter() - t0) * 1000.0)
+                if self.vision.last_stage is not None:  # A new frame was processed
+                    self.metrics.observe("detect", self.vision.timings["detect"] * 1000.0)
             else:
                 self.latest_face_pos = None
 
-            # Check camera 10 times a second (Sufficient for eyes)
-            await asyncio.sleep(0.1)
+            # ~30 Hz in hybrid mode (tracker is cheap), 10 Hz for cascade-only
+            await asyncio.sleep(config.VISION_LOOP_INTERVAL)
+
+    async def send_mic_audio(self, data):
+        """Uplinks one mic chunk, through the local VAD gate if enabled."""
+        if self.vad is None:
+            chunks = [data]
+        else:
+            was_speaking = self.vad.is_speech
+            chunks = self.vad.process(data)
+
+        sent = 0
+        try:
+            for chunk in chunks:
+                await self.session.send_realtime_input(
+                    media={"data": chunk, "mime_type": f"audio/pcm;rate={config.MIC_RATE}"})
+                self.metrics.count("bytes_sent.audio", len(chunk))
+                sent += 1
+
+            # Gate just closed: tell the server the stream paused so its own VAD ends the turn
+            if self.vad is not None and was_speaking and not self.vad.is_speech:
+                await self.session.send_realtime_input(audio_stream_end=True)
+                self.awaiting_reply_since = self.vad.speech_ended_at
+                if self.state == "LISTENING":
+                    self.state = "IDLE"  # Barge-in finished, waiting for the new reply
+        except:
+            # Link dropped mid-send: keep the audio for when it's back
+            self.connection.mark_offline()
+            for chunk in chunks[sent:]:
+                self.connection.buffer_mic(chunk)
 
     async def send_data_loop(self):
+        """Mic uplink. Wakes up when PortAudio delivers a chunk (no polling)."""
         while self.running:
-            if self.state in ["IDLE", "LISTENING", "TALKING"]:
-                # Audio
-                data = self.audio.read_mic()
-                if data and self.session:
+            # Always drain the queue so stale audio never gets sent later
+            data = await self.audio.read_mic()
+
+            if self.state in ["IDLE", "LISTENING", "TALKING"] and self.session:
+                t0 = time.perf_counter()
+                # Audio captured while we were offline goes first. Only this loop sends
+                # mic audio, so the replay can't interleave with live chunks.
+                for chunk in self.connection.drain_mic():
+                    await self.send_mic_audio(chunk)
+                await self.send_mic_audio(data)
+                self.metrics.observe("loop.send", (time.perf_counter() - t0) * 1000.0)
+            else:
+                # Link down mid-conversation: keep the last few seconds (no-op before the first connect)
+                self.connection.buffer_mic(data)
+
+    async def send_image_loop(self):
+        """Image uplink on a fixed tick; ImageUplink skips static scenes and crops to the face."""
+        while self.running:
+            if self.state in ["IDLE", "LISTENING", "TALKING"] and self.session:
+                # Vision (Images for Gemini, not for Face Tracking)
+                img = await asyncio.to_thread(self.uplink.prepare)
+                if img and self.session:
                     try:
-                        await self.session.send_realtime_input(
-                            media={"data": data, "mime_type": "audio/pcm;rate=16000"})
+                        await self.session.send_realtime_input(media={"data": img, "mime_type": "image/jpeg"})
+                        self.uplink.record_sent(len(img))
+                        self.metrics.count("bytes_sent.image", len(img))
                     except:
                         pass
 
-                # Vision (Images for Gemini, not for Face Tracking)
-                # Send 1 frame every second
-                if time.time() % 1.0 < 0.1:
-                    img = await asyncio.to_thread(self.vision.get_frame_bytes)
-                    if img and self.session:
-                        try:
-                            await self.session.send_realtime_input(media={"data": img, "mime_type": "image/jpeg"})
-                        except:
-                            pass
-
-            await asyncio.sleep(0.01)
+            await asyncio.sleep(config.IMAGE_UPLINK_INTERVAL)
 
     async def receive_loop(self):
         while self.running:
             if self.session:
                 try:
                     async for response in self.session.receive():
-                        if response.data:
-                            # Play audio in thread
-                            await asyncio.to_thread(self.audio.write_audio, response.data)
-
-                        if response.text:
-                            text_upper = response.text.upper()
-
-                            # Emotion
-                            tags = re.findall(r"\[(HAPPY|SAD|NEUTRAL|SURPRISED|ANGRY|LOVE)\]", text_upper)
-                            if tags: self.emotion = tags[-1]
-
-
-                            if "[ACTION:GIVE_CHOCOLATE]" in text_upper:
-                                    print(">>> TRIGGER: GIVING CHOCOLATE")
-                                    asyncio.create_task(self.body.give_chocolate_sequence(self.vision))
-
-                                # Action: Move Forward (New)
-                            if "[ACTION:MOVE_FORWARD]" in text_upper:
-                                    print(">>> TRIGGER: MOVING FORWARD")
-                                    # Create a simple move function in hardware.py
-                                    # For now, just a print is fine if motors aren't wired
-                                    asyncio.create_task(self.body.move_wheels("forward", 1.5))
-
+                        t0 = time.perf_counter()
+                        self.connection.observe(response)
+                        if response.server_content and response.server_content.interrupted:
+                            # Server-side VAD heard the user: flush whatever is still queued
+                            self.handle_barge_in("server")
+
+                        if response.data and self.drop_reply:
+                            # Rest of a reply the user already talked over
+                            self.metrics.count("bytes_dropped.barge_in", len(response.data))
+                        elif response.data:
+                            self.reply_streaming = True
+                            if self.state == "LISTENING":
+                                self.state = "IDLE"
+                            # Queue into the jitter buffer (non-blocking, speaker callback plays it)
+                            self.audio.write_audio(response.data)
+                            self.metrics.count("bytes_received.audio", len(response.data))
+
+                            self.boot.mark("first_reply")
+
+                            # End-to-end: user stopped talking -> first reply audio byte
+                            if self.awaiting_reply_since is not None:
+                                self.metrics.observe("turn_latency", (time.time() - self.awaiting_reply_since) * 1000.0)
+                                self.awaiting_reply_since = None
+
+                        if response.text and not self.drop_reply:
+                            # Tags may be split across streamed chunks; the parser stitches them
+                            for event in self.tags.feed(response.text):
+                                if event.kind == "emotion":
+                                    self.emotion = event.name
+                                elif event.kind == "action":
+                                    self.trigger_action(event.name)
+
+                        if response.server_content and response.server_content.turn_complete:
+                            self.audio.end_of_turn()
+                            self.tags.end_turn()
+                            self.drop_reply = False
+                            self.reply_streaming = False
+
+                        self.metrics.observe("loop.receive", (time.perf_counter() - t0) * 1000.0)
 
                 except Exception as e:
                     print(f"Receive Error: {e}")
@@ -216,55 +440,87 @@ class AIRARobot:
             await asyncio.sleep(0.1)
 
     async def run(self):
-        gemini_config = LiveConnectConfig(
-            response_modalities=["AUDIO"],
-            system_instruction=Content(parts=[Part(text=SYSTEM_INSTRUCTION)])
-        )
+        """
+        Boot orchestrator. The face goes up first; then audio, camera, servos
+        and the Live client all start at once, and the session handshake runs
+        while they are still opening (and while the wake-up SFX plays).
+        Stage durations are printed as a startup timeline once online.
+        """
+        self.tasks = []
 
-        # Start the Face UI (High Priority)
+        # Start the Face UI (High Priority): the display was opened in __init__
         face_task = asyncio.create_task(self.face_drawing_loop())
-        # Start the Vision Processor (Background)
-        vision_task = asyncio.create_task(self.vision_loop())
-
+        self.boot.mark("face")
         print(">>> BOOTING AIRA...")
-        await asyncio.sleep(1)
-        self.state = "WAKING"
-        self.audio.play_sfx("wakeup")
-        await asyncio.sleep(2)
+
+        # Camera / audio / servos, concurrently (starts vision + head loops as each is ready)
+        devices_task = asyncio.create_task(self.start_devices())
+        # Start the Motion Dispatcher (one body motion at a time)
+        self.tasks.append(asyncio.create_task(self.dispatcher.run()))
+        # Metrics (log line / local endpoint; nothing runs when disabled)
+        self.tasks += self.metrics.start_tasks(config.METRICS_LOG_INTERVAL, config.METRICS_HTTP_PORT)
 
         while self.running:
-            if self.state == "WAKING" or self.state == "RETRYING":
+            if devices_task.done() and devices_task.exception() is not None:
+                # A device failed to open: retrying the connection won't help
+                raise devices_task.exception()
+
+            if self.session is None and self.state in ["SLEEPING", "WAKING", "RETRYING"]:
                 try:
+                    if self.connector is None:
+                        self.connector = await self.boot.run_in_thread("client", self.create_connector)
+                        self.connection.connector = self.connector
                     print(">>> CONNECTING...")
-                    async with self.client.aio.live.connect(model=MODEL_ID, config=gemini_config) as session:
+                    async with self.connection.connect() as session:
+                        self.boot.mark("session")
+                        # Handshake done; the devices may still be opening
+                        await devices_task
                         self.session = session
                         self.state = "IDLE"
+                        self.outage_reported = False
                         print(">>> ONLINE. NAMASTE!")
-                        await asyncio.gather(self.send_data_loop(), self.receive_loop())
+                        if "online" not in self.boot.milestones:
+                            self.boot.mark("online")
+                            self.boot.report()
+
+                        session_tasks = [asyncio.create_task(self.send_image_loop()),
+                                         asyncio.create_task(self.receive_loop())]
+                        try:
+                            await asyncio.gather(*session_tasks)
+                        finally:
+                            # One loop failing must not leave the other running on a dead session
+                            for task in session_tasks:
+                                task.cancel()
                 except Exception as e:
                     print(f"Connection Failed: {e}")
+                    if not self.outage_reported and self.audio:
+                        self.audio.play_sfx("error")  # Once per outage, not per retry
+                        self.outage_reported = True
                     self.state = "ERROR"
                     self.session = None
-                    self.last_error_time = time.time()
-                    self.audio.play_sfx("error")
-
-            if self.state == "ERROR":
-                if time.time() - self.last_error_time > self.retry_delay:
+                    delay = self.connection.failed()
+                    print(f">>> Retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
                     self.state = "RETRYING"
+                    continue
 
             await asyncio.sleep(0.1)
 
         await face_task
-        await vision_task
+        for task in self.tasks:
+            task.cancel()
+        await self.connection.close()
         pygame.quit()
-        sys.exit()
-
 
 if __name__ == "__main__":
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    if config.SESSION_BACKEND == "gemini" and not API_KEY:
+        print("ERROR: API Key not found in .env file")
+        sys.exit(1)
     bot = AIRARobot()
     try:
         asyncio.run(bot.run())
     except KeyboardInterrupt:
-        pass
\ No newline at end of file
+        pass
+    sys.exit()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+import heapq
+
+
+class ActionDispatcher:
+    """
+    Serialises RobotBody motions coming from model tags.
+
+    - Bounded priority queue: lower number = more urgent.
+    - Coalescing: a command that is already queued or running is ignored.
+    - Preemption: a more urgent command cancels the motion in flight.
+    - Only ONE motion task runs at a time, so a burst of tags can never pile up
+      dozens of concurrent motor/servo tasks.
+    """
+
+    def __init__(self, max_pending=8):
+        self.max_pending = max_pending
+        self.heap = []  # [priority, seq, name, factory, alive]
+        self.pending = {}  # name -> heap entry
+        self.seq = 0
+        self.wakeup = None  # Created in run(): before 3.10 an Event binds to the loop current at construction
+
+        self.current_name = None
+        self.current_priority = None
+        self.current_task = None
+
+        # Stats
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.preempted = 0
+        self.completed = 0
+
+    def submit(self, name, factory, priority=5):
+        """
+        Queues a motion. `factory` is a zero-argument callable returning the coroutine
+        (so nothing starts until the dispatcher runs it). Returns False if ignored.
+        """
+        self.submitted += 1
+        if name == self.current_name or name in self.pending:
+            self.coalesced += 1
+            return False
+
+        if len(self.pending) >= self.max_pending:
+            # Full: evict the least urgent (newest among equals), unless that's us
+            worst = max(self.pending.values(), key=lambda e: (e[0], e[1]))
+            if worst[0] <= priority:
+                self.dropped += 1
+                return False
+            self._remove(worst)
+            self.dropped += 1
+
+        if self.current_task is not None and priority < self.current_priority:
+            print(f"[BODY] {name} preempts {self.current_name}")
+            self.current_task.cancel()
+            self.preempted += 1
+
+        entry = [priority, self.seq, name, factory, True]
+        self.seq += 1
+        heapq.heappush(self.heap, entry)
+        self.pending[name] = entry
+        if self.wakeup is not None:
+            self.wakeup.set()
+        return True
+
+    def _remove(self, entry):
+        entry[4] = False  # Lazy delete, skipped when popped
+        self.pending.pop(entry[2], None)
+
+    def cancel_all(self):
+        """Emergency stop: drop everything queued and cancel the running motion."""
+        for entry in list(self.pending.values()):
+            self._remove(entry)
+        if self.current_task is not None:
+            self.current_task.cancel()
+
+    def _pop(self):
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            if entry[4]:
+                self.pending.pop(entry[2], None)
+                return entry
+        return None
+
+    async def run(self):
+        self.wakeup = asyncio.Event()
+        if self.pending:
+            self.wakeup.set()  # Submitted before the dispatcher started
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+
+            entry = self._pop()
+            while entry is not None:
+                priority, _, name, factory, _ = entry
+                self.current_name = name
+                self.current_priority = priority
+                self.current_task = asyncio.create_task(factory())
+                try:
+                    # asyncio.wait doesn't raise if the motion is cancelled (preempted)
+                    await asyncio.wait([self.current_task])
+                    if not self.current_task.cancelled():
+                        if self.current_task.exception() is not None:
+                            print(f"[BODY] {name} failed: {self.current_task.exception()}")
+                        else:
+                            self.completed += 1
+                except asyncio.CancelledError:
+                    # Dispatcher itself is shutting down: stop the motion too
+                    self.current_task.cancel()
+                    raise
+                finally:
+                    self.current_name = None
+                    self.current_priority = None
+                    self.current_task = None
+
+                entry = self._pop()
+
+    def get_stats(self):
+        return {
+            "running": self.current_name,
+            "pending": len(self.pending),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "preempted": self.preempted,
+            "completed": self.completed,
+        }
@@ -0,0 +1,108 @@
+import threading
+
+
+class JitterBuffer:
+    """
+    Bounded PCM FIFO between the network (push) and the speaker callback (pull).
+
+    Playback only starts once `target_ms` of audio is queued, so bursty network
+    delivery doesn't cause gaps. If the buffer runs dry in the middle of a turn
+    that counts as an underrun and it re-primes; once the turn is marked
+    complete the tail is played out without waiting for the target.
+    If the network delivers more than `max_ms` ahead, the oldest audio is dropped (overrun).
+    """
+
+    def __init__(self, rate, target_ms=120, max_ms=20000, sample_width=2):
+        bytes_per_ms = rate * sample_width // 1000
+        self.rate = rate
+        self.sample_width = sample_width
+        self.capacity = max(bytes_per_ms * max_ms, sample_width)
+        self.target = bytes_per_ms * target_ms
+
+        self.buf = bytearray(self.capacity)
+        self.read_pos = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+        self.primed = False     # Reached target latency, playing
+        self.turn_open = False  # More audio for this turn may still arrive
+
+        # Stats
+        self.underruns = 0
+        self.overruns = 0
+        self.dropped_bytes = 0
+        self.flushed_bytes = 0  # Discarded by clear() (barge-in)
+
+    def push(self, data):
+        n = len(data)
+        if n == 0:
+            return
+        with self.lock:
+            self.turn_open = True
+            if n > self.capacity:
+                # Bigger than the whole buffer: keep only the newest part
+                data = data[n - self.capacity:]
+                self.dropped_bytes += n - self.capacity
+                n = self.capacity
+
+            overflow = self.size + n - self.capacity
+            if overflow > 0:
+                self.read_pos = (self.read_pos + overflow) % self.capacity
+                self.size -= overflow
+                self.overruns += 1
+                self.dropped_bytes += overflow
+
+            write_pos = (self.read_pos + self.size) % self.capacity
+            first = min(n, self.capacity - write_pos)
+            self.buf[write_pos:write_pos + first] = data[:first]
+            if first < n:
+                self.buf[0:n - first] = data[first:]
+            self.size += n
+
+    def pull(self, nbytes):
+        """
+        Returns exactly `nbytes` of PCM (padded with silence) and how many
+        of those bytes were real audio.
+        """
+        with self.lock:
+            if not self.primed and self.size > 0:
+                if self.size >= self.target or not self.turn_open:
+                    self.primed = True
+
+            if not self.primed:
+                return bytes(nbytes), 0
+
+            n = min(nbytes, self.size)
+            n -= n % self.sample_width
+            first = min(n, self.capacity - self.read_pos)
+            chunk = self.buf[self.read_pos:self.read_pos + first]
+            if first < n:
+                chunk += self.buf[0:n - first]
+            self.read_pos = (self.read_pos + n) % self.capacity
+            self.size -= n
+
+            if self.size == 0:
+                # Ran dry: wait for target latency again before resuming
+                self.primed = False
+                if n < nbytes and self.turn_open:
+                    self.underruns += 1
+
+        if n < nbytes:
+            chunk += bytes(nbytes - n)
+        return bytes(chunk), n
+
+    def end_of_turn(self):
+        """Server finished this reply: play out whatever is left without priming."""
+        with self.lock:
+            self.turn_open = False
+
+    def clear(self):
+        with self.lock:
+            self.flushed_bytes += self.size
+            self.read_pos = 0
+            self.size = 0
+            self.primed = False
+            self.turn_open = False
+
+    def buffered_ms(self):
+        return self.size / float(self.sample_width) * 1000.0 / self.rate
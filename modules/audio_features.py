@@ -0,0 +1,82 @@
+import math
+import numpy as np
+
+
+class AudioFeatures:
+    """
+    One-pass loudness features for int16 PCM chunks.
+
+    RMS, peak, zero-crossing rate and a smoothed dB level are computed with
+    preallocated scratch buffers: the int16 samples are viewed (not copied) with
+    np.frombuffer, cast once into a float32 scratch array and squared-summed with
+    a BLAS dot product, so no float64 temporaries are created per chunk.
+
+    Use one instance per stream (mic, speaker): the scratch buffers are not shared
+    between threads.
+    """
+
+    def __init__(self, max_samples=4096, smoothing=0.3):
+        self.smoothing = smoothing  # 0..1, weight of the newest chunk in smoothed_db
+        self._alloc(max_samples)
+
+        # Results of the last analyze()
+        self.rms = 0.0
+        self.peak = 0.0
+        self.zcr = 0.0  # Zero crossings per sample (0..1)
+        self.db = -96.0  # dBFS
+        self.smoothed_db = -96.0
+
+    def _alloc(self, n):
+        self.scratch = np.empty(n, dtype=np.float32)
+        self.signs = np.empty(n, dtype=np.bool_)
+        self.crossings = np.empty(n, dtype=np.bool_)
+
+    def analyze(self, data):
+        """Updates and returns self. `data` is raw int16 PCM bytes."""
+        n = len(data) // 2
+        if n == 0:
+            self.rms = self.peak = self.zcr = 0.0
+            self.db = -96.0
+            self.smoothed_db += (self.db - self.smoothed_db) * self.smoothing
+            return self
+        if n > len(self.scratch):
+            self._alloc(n)
+
+        shorts = np.frombuffer(data, dtype=np.int16, count=n)
+        x = self.scratch[:n]
+        np.copyto(x, shorts, casting="unsafe")
+
+        # RMS: float32 dot product (one pass, no temporaries)
+        self.rms = math.sqrt(float(np.dot(x, x)) / n)
+        self.peak = float(np.abs(x, out=x).max())
+
+        # Zero crossings: sign flips between neighbouring samples
+        signs = self.signs[:n]
+        np.signbit(shorts, out=signs)
+        crossings = self.crossings[:n - 1]
+        np.not_equal(signs[1:], signs[:-1], out=crossings)
+        self.zcr = np.count_nonzero(crossings) / float(n)
+
+        self.db = 20.0 * math.log10(max(self.rms, 1.0) / 32768.0)
+        self.smoothed_db += (self.db - self.smoothed_db) * self.smoothing
+        return self
+
+    def level(self, data):
+        """RMS only (cheapest path, for the speaker callback). Doesn't touch the other features."""
+        n = len(data) // 2
+        if n == 0:
+            return 0.0
+        if n > len(self.scratch):
+            self._alloc(n)
+        x = self.scratch[:n]
+        np.copyto(x, np.frombuffer(data, dtype=np.int16, count=n), casting="unsafe")
+        return math.sqrt(float(np.dot(x, x)) / n)
+
+
+def rms(data):
+    """Standalone RMS of int16 PCM bytes (float32 dot product, no float64 copy)."""
+    n = len(data) // 2
+    if n == 0:
+        return 0.0
+    x = np.frombuffer(data, dtype=np.int16, count=n).astype(np.float32)
+    return math.sqrt(float(np.dot(x, x)) / n)
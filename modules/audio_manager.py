@@ -1,42 +1,110 @@
 # modules/audio_manager.py
 import pyaudio
-import numpy as np
+import asyncio
 import pygame
 import os
-import math
+import collections
+import time
 import config
+from modules.audio_buffer import JitterBuffer
+from modules.lipsync import LoudnessEnvelope
+from modules.audio_features import AudioFeatures, rms
+from modules.audio_sources import FileMicStream, NullOutputStream
+from modules.echo import EchoSuppressor
+from modules.vad import BargeInDetector
 
 
 class AudioManager:
-    def __init__(self):
+    def __init__(self, offline=False, mic_file=None):
+        """
+        offline=True: no sound card. The mic is fed from `mic_file` (or synthetic
+        utterances) and the speaker callback is drained by a silent clock,
+        so the whole pipeline runs headless with real-time pacing.
+        """
         # 1. Setup Local SFX
+        if offline:
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # SFX go nowhere
         pygame.mixer.init()
         self.sounds = {}
         self.load_sfx()
 
         # 2. Setup Streaming
-        self.p = pyaudio.PyAudio()
+        self.p = None if offline else pyaudio.PyAudio()
+
+        # Volatiles
+        self.current_in_volume = 0.0
+
+        # Feature extractors (one per stream: each owns its scratch buffers)
+        self.mic_features = AudioFeatures()
+        self.speaker_features = AudioFeatures()
+
+        # Lip-sync: per-block loudness stamped with when it leaves the speaker
+        self.envelope = LoudnessEnvelope(release=config.LIPSYNC_RELEASE)
+        self.output_latency = config.SPEAKER_LATENCY_FALLBACK
+
+        # Barge-in: checked on the mic thread so the flush doesn't wait for the event loop
+        self.barge_in = BargeInDetector(config.BARGE_IN_RMS, config.BARGE_IN_CHUNKS) if config.BARGE_IN_LOCAL else None
+        self.on_barge_in = None   # Called on the event loop when the user talks over playback
+        self.on_silenced = None   # Called on the event loop with interrupt -> silence latency (ms)
+        self.interrupted_at = None
+        self.interrupts = 0
+        self.last_interrupt_latency = 0.0
+        # Mic chunks the echo stage dropped while barge-in was counting loud chunks:
+        # if it fires, they were the user, not echo, and are sent after all
+        self.held_chunks = collections.deque(maxlen=config.BARGE_IN_CHUNKS)
+
+        # Echo suppression: the speaker callback feeds what it plays as the reference
+        self.echo = None
+        if config.ECHO_MODE != "off":
+            self.echo = EchoSuppressor(config.ECHO_MODE, config.MIC_RATE, config.SPEAKER_RATE,
+                                       ref_rms=config.ECHO_REF_RMS, tail_ms=config.ECHO_TAIL_MS,
+                                       duck_gain=config.ECHO_DUCK_GAIN, residual_rms=config.ECHO_RESIDUAL_RMS,
+                                       taps=config.ECHO_NLMS_TAPS, step=config.ECHO_NLMS_STEP)
+
+        # Playback queue (exists before either stream starts calling back)
+        self.playback = JitterBuffer(config.SPEAKER_RATE, config.JITTER_TARGET_MS, config.JITTER_MAX_MS)
 
         # Mic Input
-        self.stream_in = self.p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=16000,
-            input=True,
-            frames_per_buffer=1024
-        )
+        # Callback stream: PortAudio hands us each chunk, which is forwarded to an
+        # asyncio queue (see attach_loop) -> send_data_loop awaits instead of polling.
+        self.loop = None
+        self.mic_queue = None
+        self.mic_overflows = 0  # PortAudio input overflows (we were too slow)
+        self.mic_dropped = 0    # Chunks dropped because the queue was full
+        if offline:
+            self.stream_in = FileMicStream(config.MIC_RATE, config.MIC_CHUNK, self._mic_callback, mic_file)
+        else:
+            self.stream_in = self.p.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=config.MIC_RATE,
+                input=True,
+                frames_per_buffer=config.MIC_CHUNK,
+                stream_callback=self._mic_callback
+            )
 
         # Speaker Output
-        self.stream_out = self.p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=24000,
-            output=True
-        )
-
-        # Volatiles
-        self.current_out_volume = 0.0
-        self.current_in_volume = 0.0
+        # Callback stream: PortAudio pulls from the jitter buffer on its own thread,
+        # so write_audio() never blocks the receive loop.
+        if offline:
+            self.stream_out = NullOutputStream(config.SPEAKER_RATE, config.SPEAKER_CHUNK, self._playback_callback)
+        else:
+            self.stream_out = self.p.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=config.SPEAKER_RATE,
+                output=True,
+                frames_per_buffer=config.SPEAKER_CHUNK,
+                stream_callback=self._playback_callback
+            )
+        self.stream_out.start_stream()
+        if offline:
+            self.output_latency = 0.0  # Nothing between the callback and "the speaker"
+        else:
+            self.output_latency = self.stream_out.get_output_latency() or config.SPEAKER_LATENCY_FALLBACK
+        if self.echo is not None:
+            # Played now -> heard after output latency -> in a mic callback after input latency
+            self.echo.set_delay(self.output_latency + self.stream_in.get_input_latency() + config.ECHO_PATH_MS / 1000.0)
 
     def load_sfx(self):
         if not os.path.exists(config.SOUNDS_DIR):
@@ -69,42 +137,147 @@ class AudioManager:
         self.play_sfx(choice)
 
     def calculate_rms(self, data):
-        try:
-            if not data: return 0
-            shorts = np.frombuffer(data, dtype=np.int16)
-            if len(shorts) == 0: return 0
-            sum_squares = np.sum(shorts.astype(np.float64) ** 2)
-            return math.sqrt(sum_squares / len(shorts))
-        except:
-            return 0
+        """One-off RMS. Streams use mic_features / speaker_features instead."""
+        if not data: return 0
+        return rms(data)
+
+    def attach_loop(self, loop):
+        """Starts delivering mic chunks into an asyncio queue owned by `loop`."""
+        self.mic_queue = asyncio.Queue(maxsize=config.MIC_QUEUE_MAX)
+        self.loop = loop
+
+    def _mic_callback(self, in_data, frame_count, time_info, status):
+        """Runs on PortAudio's thread once per mic chunk."""
+        if status & pyaudio.paInputOverflow:
+            self.mic_overflows += 1
+
+        level = self.current_in_volume = self.mic_features.analyze(in_data).rms
 
-    def read_mic(self):
-        if self.stream_in.get_read_available() > 0:
-            data = self.stream_in.read(1024, exception_on_overflow=False)
-            self.current_in_volume = self.calculate_rms(data)
-            return data
-        return None
+        # Echo stage: drops/cleans chunks that are only the robot's own voice.
+        # In nlms mode `level` becomes the echo-free estimate, which barge-in then uses.
+        data = in_data
+        if self.echo is not None:
+            data, level = self.echo.process(in_data, level)
+
+        chunks = [data] if data is not None else []
+        barged_in = False
+        if self.barge_in is not None:
+            if data is None:
+                self.held_chunks.append(in_data)
+            else:
+                self.held_chunks.clear()  # Anything held is older than what's being sent now
+            if self.barge_in.update(level, self.is_playing()):
+                self.interrupt()
+                barged_in = True
+                chunks = list(self.held_chunks) + ([data] if data is not None else [])
+                self.held_chunks.clear()
+
+        loop = self.loop
+        if loop is not None:
+            try:
+                for chunk in chunks:
+                    loop.call_soon_threadsafe(self._enqueue_mic, chunk)
+                if barged_in and self.on_barge_in is not None:
+                    loop.call_soon_threadsafe(self.on_barge_in)
+            except RuntimeError:
+                pass  # Loop already closed (shutting down)
+        return None, pyaudio.paContinue
+
+    def _enqueue_mic(self, data):
+        """Runs on the event loop. Drops the oldest chunk if nobody is reading."""
+        if self.mic_queue.full():
+            self.mic_queue.get_nowait()
+            self.mic_dropped += 1
+        self.mic_queue.put_nowait(data)
+
+    async def read_mic(self):
+        """Waits for the next mic chunk (raw int16 PCM bytes)."""
+        return await self.mic_queue.get()
+
+    def get_mic_stats(self):
+        return {
+            "queued": self.mic_queue.qsize() if self.mic_queue else 0,
+            "overflows": self.mic_overflows,
+            "dropped": self.mic_dropped,
+        }
+
+    def get_echo_stats(self):
+        return self.echo.get_stats() if self.echo is not None else {"mode": "off"}
 
     def write_audio(self, data):
         """
-        Writes audio to speaker.
-        CRITICAL FIX: Reset volume to 0 immediately after writing.
+        Queues audio for the speaker. Never blocks:
+        the playback callback drains the jitter buffer in real time.
         """
         if data:
-            # 1. Set Volume High -> Triggers "TALKING" state
-            self.current_out_volume = self.calculate_rms(data)
+            self.playback.push(data)
+
+    def end_of_turn(self):
+        """Server finished its reply -> play out the tail without waiting for more."""
+        self.playback.end_of_turn()
 
-            # 2. Write to stream -> This BLOCKS until the sound is heard
-            self.stream_out.write(data)
+    def is_playing(self):
+        """True while reply audio is queued or still audible."""
+        return self.playback.size > 0 or self.envelope.sample() > 1.0
 
-            # 3. Audio finished? Reset Volume -> Triggers "IDLE" state
-            self.current_out_volume = 0.0
+    def interrupt(self):
+        """
+        Barge-in: drop all queued reply audio and close the mouth now.
+        The next playback block is silence; the callback records how long
+        until that silence actually reaches the speaker.
+        """
+        self.playback.clear()
+        self.envelope.reset()
+        if self.echo is not None:
+            self.echo.reset()  # Otherwise the mic stays gated for delay + tail
+        if self.interrupted_at is None:
+            self.interrupted_at = time.perf_counter()
+        self.interrupts += 1
+
+    def _playback_callback(self, in_data, frame_count, time_info, status):
+        """Runs on PortAudio's thread once per output block."""
+        chunk, real_bytes = self.playback.pull(frame_count * 2)
+        if self.echo is not None:
+            self.echo.push_reference(chunk)
+
+        # When will this block actually be heard? PortAudio tells us if the host API supports it.
+        latency = self.output_latency
+        if time_info:
+            dac_delay = time_info.get("output_buffer_dac_time", 0) - time_info.get("current_time", 0)
+            if 0 < dac_delay < 1.0:
+                latency = dac_delay
+
+        now = time.perf_counter()
+        level = self.speaker_features.level(chunk) if real_bytes else 0.0
+        self.envelope.publish(now + latency, level)
+
+        if self.interrupted_at is not None and real_bytes == 0:
+            # First silent block after a barge-in: silence is audible once it leaves the DAC
+            self.last_interrupt_latency = now + latency - self.interrupted_at
+            self.interrupted_at = None
+            if self.loop is not None and self.on_silenced is not None:
+                try:
+                    self.loop.call_soon_threadsafe(self.on_silenced, self.last_interrupt_latency * 1000.0)
+                except RuntimeError:
+                    pass
+        return chunk, pyaudio.paContinue
+
+    def get_playback_stats(self):
+        return {
+            "buffered_ms": self.playback.buffered_ms(),
+            "underruns": self.playback.underruns,
+            "overruns": self.playback.overruns,
+            "dropped_bytes": self.playback.dropped_bytes,
+            "interrupts": self.interrupts,
+            "interrupt_to_silence_ms": self.last_interrupt_latency * 1000.0,
+        }
 
     def get_user_volume(self):
         return self.current_in_volume
 
     def get_bot_volume(self):
-        return self.current_out_volume
+        """Loudness of the speech coming out of the speaker right now (lip-sync)."""
+        return self.envelope.sample()
 
     def close(self):
         try:
@@ -112,6 +285,7 @@ class AudioManager:
             self.stream_in.close()
             self.stream_out.stop_stream()
             self.stream_out.close()
-            self.p.terminate()
+            if self.p is not None:
+                self.p.terminate()
         except:
             pass
\ No newline at end of file
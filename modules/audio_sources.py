@@ -0,0 +1,122 @@
+import threading
+import time
+import wave
+import numpy as np
+
+
+def synth_speech(ms, rate, seed=0):
+    """Speech-like int16 PCM: a voiced harmonic tone with ~4 Hz syllable bursts."""
+    n = int(rate * ms / 1000)
+    t = np.arange(n) / rate
+    f0 = 140.0 + 20.0 * np.sin(2 * np.pi * 0.5 * t + seed)
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(2, 12))
+    syllables = 0.6 + 0.4 * np.sin(2 * np.pi * 4.0 * t + seed) ** 2
+    return (voice * syllables * 3000).astype(np.int16).tobytes()
+
+
+def read_wav(path):
+    """16-bit mono WAV -> (pcm bytes, sample rate)."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+class _CallbackStream:
+    """
+    Minimal stand-in for a PyAudio callback stream: a thread calls
+    callback(in_data, frame_count, time_info, status) once per block, in real time.
+    """
+
+    def __init__(self, rate, frames_per_buffer, callback, name):
+        self.rate = rate
+        self.frames = frames_per_buffer
+        self.callback = callback
+        self.name = name
+        self.running = False
+        self.thread = None
+
+    def start_stream(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop_stream(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def close(self):
+        self.stop_stream()
+
+    def is_active(self):
+        return self.running
+
+    def get_output_latency(self):
+        return 0.0
+
+    def get_input_latency(self):
+        return 0.0
+
+    def _run(self):
+        period = self.frames / float(self.rate)
+        deadline = time.perf_counter()
+        while self.running:
+            self._block()
+            # Absolute deadlines: no drift from callback cost
+            deadline += period
+            wait = deadline - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            elif wait < -1.0:
+                deadline = time.perf_counter()  # Fell far behind (debugger, suspend): resync
+
+    def _block(self):
+        raise NotImplementedError
+
+
+class FileMicStream(_CallbackStream):
+    """
+    Feeds a 16-bit mono WAV (at MIC_RATE) to the mic callback, looping.
+    With no path, plays synthetic utterances: `speech_ms` of speech-like audio,
+    then `silence_ms` of low room noise, so the VAD gate opens and closes.
+    """
+
+    def __init__(self, rate, frames_per_buffer, callback, path=None, speech_ms=1500, silence_ms=2500):
+        super().__init__(rate, frames_per_buffer, callback, "FileMic")
+        if path is not None:
+            pcm, file_rate = read_wav(path)
+            if file_rate != rate:
+                print(f"[AUDIO] {path} is {file_rate} Hz, mic rate is {rate} Hz")
+        else:
+            rng = np.random.default_rng(0)
+            noise = rng.normal(0, 40, rate * silence_ms // 1000).astype(np.int16).tobytes()
+            pcm = synth_speech(speech_ms, rate) + noise
+        self.pcm = pcm
+        self.pos = 0
+        self.start_stream()  # PyAudio input streams start on open
+
+    def _block(self):
+        n = self.frames * 2
+        chunk = self.pcm[self.pos:self.pos + n]
+        self.pos += n
+        if len(chunk) < n:
+            self.pos = n - len(chunk)
+            chunk += self.pcm[:self.pos]
+        self.callback(chunk, self.frames, None, 0)
+
+
+class NullOutputStream(_CallbackStream):
+    """Pulls from the playback callback at the real sample rate and discards it."""
+
+    def __init__(self, rate, frames_per_buffer, callback):
+        super().__init__(rate, frames_per_buffer, callback, "NullSpeaker")
+        self.blocks = 0
+
+    def _block(self):
+        self.callback(None, self.frames, None, 0)
+        self.blocks += 1
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+
+class BootTimer:
+    """
+    Start-up profiler for the boot orchestrator.
+
+    Stages (camera, audio devices, Live client...) run concurrently on worker
+    threads via run_in_thread(); milestones (face on screen, session open,
+    first reply) are stamped with mark(). Everything is relative to when the
+    timer was created, i.e. cold start.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}      # name -> (started_at, finished_at), seconds since start
+        self.milestones = {}  # name -> seconds since start
+
+    def now(self):
+        return time.perf_counter() - self.start
+
+    async def run_in_thread(self, name, fn, *args):
+        """Runs a blocking constructor off the event loop and records how long it took."""
+        t0 = self.now()
+        try:
+            return await asyncio.to_thread(fn, *args)
+        finally:
+            t1 = self.now()
+            self.stages[name] = (t0, t1)
+            print(f"[BOOT] {name} ready in {t1 - t0:.2f}s")
+
+    def mark(self, name):
+        """Records a milestone the first time it happens."""
+        if name not in self.milestones:
+            self.milestones[name] = self.now()
+            print(f"[BOOT] {name} at {self.milestones[name]:.2f}s")
+
+    def get_stats(self):
+        stats = {f"{name}_s": end - begin for name, (begin, end) in self.stages.items()}
+        stats.update({f"t_{name}_s": t for name, t in self.milestones.items()})
+        return stats
+
+    def report(self):
+        print("[BOOT] --- Startup timeline ---")
+        events = [(begin, f"{name:<12} {begin:6.2f}s -> {end:6.2f}s  ({end - begin:.2f}s)")
+                  for name, (begin, end) in self.stages.items()]
+        events += [(t, f"{name:<12} {t:6.2f}s") for name, t in self.milestones.items()]
+        for _, line in sorted(events):
+            print(f"[BOOT]   {line}")
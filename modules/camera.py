@@ -0,0 +1,165 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+
+class FrameGrabber:
+    """
+    Owns the camera on ONE dedicated thread.
+    Frames are decoded straight into a preallocated ring of NumPy buffers,
+    and the newest slot is published as a single (frame, index, timestamp) tuple.
+
+    Consumers (face tracking, Gemini uploads) call latest() and get a view of
+    that slot: no copy, no waiting for the sensor, no fighting over cap.read().
+    A slot is only overwritten after (ring_size - 1) newer frames, so a reader
+    that needs a frame for longer than that should copy it.
+    """
+
+    def __init__(self, capture, width, height, ring_size=4):
+        self.cap = capture
+        self.ring = [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(max(2, ring_size))]
+
+        # Published as one tuple -> a single attribute store is atomic under the GIL
+        self._latest = (None, -1, 0.0)
+        self._slot = 0
+        self._index = 0
+
+        # Stats
+        self.frames_captured = 0
+        self.read_failures = 0
+        self.last_read_time = 0.0  # Seconds spent in the last cap.read()
+
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, name="FrameGrabber", daemon=True)
+        self.thread.start()
+
+    def _capture_loop(self):
+        while self.running:
+            if not self.grab():
+                time.sleep(0.01)
+
+    def grab(self):
+        """
+        Reads ONE frame into the next ring slot and publishes it.
+        Called by the capture thread, or directly when running unthreaded (benchmarks).
+        """
+        slot = self._slot
+        buf = self.ring[slot]
+        t0 = time.perf_counter()
+        ret, frame = self.cap.read(buf)
+        self.last_read_time = time.perf_counter() - t0
+        if not ret or frame is None:
+            self.read_failures += 1
+            return False
+
+        # The driver may ignore our requested size; adopt whatever it allocated
+        if frame is not buf:
+            self.ring[slot] = frame
+
+        self._latest = (frame, self._index, time.time())
+        self.frames_captured += 1
+        self._index += 1
+        self._slot = (slot + 1) % len(self.ring)
+        return True
+
+    def latest(self):
+        """
+        Returns (frame, frame_index, capture_timestamp) of the newest frame.
+        frame is None (index -1) until the first frame arrives.
+        """
+        return self._latest
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+
+class FileCapture:
+    """
+    Stand-in for cv2.VideoCapture that plays back a recorded video file,
+    or generates synthetic frames when no path is given.
+    Lets the vision pipeline run (and be benchmarked) without a webcam.
+    """
+
+    def __init__(self, path=None, width=640, height=480, loop=True, realtime=False, fps=30.0):
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime  # Sleep between frames like a real sensor
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.frame_count = 0
+        self.last_read = 0.0
+
+        self.video = None
+        if path is not None:
+            self.video = cv2.VideoCapture(path)
+            if not self.video.isOpened():
+                raise IOError(f"Could not open video: {path}")
+            self.fps = self.video.get(cv2.CAP_PROP_FPS) or fps
+        else:
+            # Synthetic scene: noisy background with a bright "face" patch drifting around
+            rng = np.random.default_rng(0)
+            self.background = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if self.video is not None:
+            return self.video.get(prop)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        return 0
+
+    def read(self, image=None):
+        if self.realtime:
+            wait = self.last_read + 1.0 / self.fps - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_read = time.time()
+
+        if self.video is not None:
+            ret, frame = self.video.read(image)
+            if not ret and self.loop:
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.video.read(image)
+            if ret and (frame.shape[1], frame.shape[0]) != (self.width, self.height):
+                frame = cv2.resize(frame, (self.width, self.height))
+        else:
+            ret, frame = self._synthetic(image)
+
+        if ret:
+            self.frame_count += 1
+        return ret, frame
+
+    def _synthetic(self, image):
+        if image is None or image.shape != self.background.shape:
+            image = np.empty_like(self.background)
+        np.copyto(image, self.background)
+
+        t = self.frame_count / self.fps
+        cx = int(self.width / 2 + np.sin(t) * self.width / 4)
+        cy = int(self.height / 2 + np.cos(t * 0.7) * self.height / 6)
+        cv2.ellipse(image, (cx, cy), (50, 65), 0, 0, 360, (170, 190, 220), -1)
+        return True, image
+
+    def release(self):
+        if self.video is not None:
+            self.video.release()
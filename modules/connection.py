@@ -0,0 +1,206 @@
+import asyncio
+import collections
+import contextlib
+import random
+import time
+
+
+class Backoff:
+    """
+    Jittered exponential backoff: base, 2x base, 4x base ... capped at max_delay.
+    `jitter` is the fraction of each delay that is randomised, so a room full of
+    robots on the same flaky Wi-Fi doesn't reconnect in lockstep.
+    """
+
+    def __init__(self, base=0.25, max_delay=10.0, jitter=0.5):
+        self.base = base
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.failures = 0
+
+    def next_delay(self):
+        delay = min(self.max_delay, self.base * (2 ** self.failures))
+        self.failures += 1
+        return delay * (1.0 - self.jitter) + random.uniform(0, delay * self.jitter)
+
+    def reset(self):
+        self.failures = 0
+
+
+class ConnectionManager:
+    """
+    Owns how AIRARobot (re)connects to the Live API.
+
+    - Backoff between failed attempts instead of a flat retry delay.
+    - Session resumption: the latest resumption handle from the server is
+      passed to the next connect(), so the conversation carries on after a drop.
+    - Optional standby: a second session is opened in the background while the
+      primary is healthy; when the primary drops (or the server sends GoAway),
+      the next connect() swaps to it instantly instead of doing a handshake.
+    - Mic replay: audio captured while offline is kept in a bounded buffer
+      (newest `mic_replay_chunks`) and handed back once the link is up again.
+    """
+
+    def __init__(self, connector, backoff=None, resumption=True, standby=False,
+                 standby_max_age=300.0, mic_replay_chunks=0):
+        self.connector = connector
+        self.backoff = backoff or Backoff()
+        self.resumption = resumption
+        self.standby_enabled = standby
+        self.standby_max_age = standby_max_age
+
+        self.resume_handle = None
+        self.standby = None  # (session, exit_stack, opened_at)
+        self.standby_task = None
+        self.mic_backlog = collections.deque(maxlen=max(1, mic_replay_chunks))
+        self.mic_replay = mic_replay_chunks > 0
+
+        self.online = False
+        self.went_offline_at = None
+
+        # Stats
+        self.connects = 0
+        self.failures = 0
+        self.resumes = 0
+        self.standby_swaps = 0
+        self.go_aways = 0
+        self.mic_buffered = 0
+        self.mic_replayed = 0
+        self.last_downtime = 0.0  # Seconds from drop to back online
+
+    def _open(self):
+        """Connector context manager, resuming the previous session if we have a handle."""
+        if self.resumption and self.resume_handle:
+            self.resumes += 1
+            return self.connector.connect(resume_handle=self.resume_handle)
+        return self.connector.connect()
+
+    @contextlib.asynccontextmanager
+    async def connect(self):
+        """
+        Yields a live session. Raises like connector.connect() if it can't
+        open one; call failed() and sleep for the returned delay before retrying.
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            standby = self._take_standby()
+            if standby is not None:
+                session, standby_stack = standby
+                stack.push_async_callback(standby_stack.aclose)
+                self.standby_swaps += 1
+                self.resume_handle = None  # Belonged to the session we just lost
+                print(">>> Switched to standby session.")
+            else:
+                resuming = self.resumption and self.resume_handle is not None
+                try:
+                    session = await stack.enter_async_context(self._open())
+                except Exception:
+                    if resuming:
+                        self.resume_handle = None  # Expired/rejected: next attempt starts fresh
+                    raise
+
+            self.connects += 1
+            self.online = True
+            self.backoff.reset()
+            if self.went_offline_at is not None:
+                self.last_downtime = time.time() - self.went_offline_at
+                print(f">>> Back online after {self.last_downtime:.1f}s")
+                self.went_offline_at = None
+            self._warm_standby()
+            try:
+                yield session
+            finally:
+                self.mark_offline()
+
+    def mark_offline(self):
+        """The link is down (session closed, or a send failed before connect() noticed)."""
+        self.online = False
+        if self.went_offline_at is None:
+            self.went_offline_at = time.time()
+
+    def failed(self):
+        """Records a failed/dropped connection. Returns seconds to wait before retrying."""
+        self.failures += 1
+        self.mark_offline()
+        # A standby is ready: no point waiting
+        if self.standby is not None:
+            return 0.0
+        return self.backoff.next_delay()
+
+    def observe(self, message):
+        """Feed every server message: picks up resumption handles and GoAway notices."""
+        update = getattr(message, "session_resumption_update", None)
+        if update is not None and getattr(update, "resumable", False) and getattr(update, "new_handle", None):
+            self.resume_handle = update.new_handle
+
+        if getattr(message, "go_away", None) is not None:
+            # Server will close this session soon: make sure a standby is on its way
+            self.go_aways += 1
+            print(f">>> Server GoAway (time left: {message.go_away.time_left})")
+            self._warm_standby(force=True)
+
+    # --- Standby connection ---
+
+    def _take_standby(self):
+        if self.standby is None:
+            return None
+        session, stack, opened_at = self.standby
+        self.standby = None
+        if time.time() - opened_at > self.standby_max_age:
+            asyncio.create_task(stack.aclose())  # Likely idle-closed by the server
+            return None
+        return session, stack
+
+    def _warm_standby(self, force=False):
+        if not (self.standby_enabled or force):
+            return
+        if self.standby is not None or (self.standby_task is not None and not self.standby_task.done()):
+            return
+        self.standby_task = asyncio.create_task(self._open_standby())
+
+    async def _open_standby(self):
+        stack = contextlib.AsyncExitStack()
+        try:
+            # Standby is a fresh session: the resume handle belongs to the primary
+            session = await stack.enter_async_context(self.connector.connect())
+        except Exception as e:
+            print(f"[NET] Standby connection failed: {e}")
+            await stack.aclose()
+            return
+        self.standby = (session, stack, time.time())
+
+    async def close(self):
+        if self.standby_task is not None:
+            self.standby_task.cancel()
+        if self.standby is not None:
+            _, stack, _ = self.standby
+            self.standby = None
+            await stack.aclose()
+
+    # --- Mic audio captured while offline ---
+
+    def buffer_mic(self, chunk):
+        """Keeps a mic chunk for replay, only while the link is down (not before the first connect)."""
+        if self.mic_replay and self.went_offline_at is not None:
+            self.mic_backlog.append(chunk)
+            self.mic_buffered += 1
+
+    def drain_mic(self):
+        """Returns the buffered chunks (oldest first) and empties the buffer."""
+        chunks = list(self.mic_backlog)
+        self.mic_backlog.clear()
+        self.mic_replayed += len(chunks)
+        return chunks
+
+    def get_stats(self):
+        return {
+            "online": self.online,
+            "connects": self.connects,
+            "failures": self.failures,
+            "resumes": self.resumes,
+            "standby_ready": self.standby is not None,
+            "standby_swaps": self.standby_swaps,
+            "go_aways": self.go_aways,
+            "mic_buffered": self.mic_buffered,
+            "mic_replayed": self.mic_replayed,
+            "last_downtime_s": self.last_downtime,
+        }
@@ -0,0 +1,179 @@
+import multiprocessing
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from modules.detectors import create_detector, detector_settings
+
+
+def _worker_main(conn, shm_name, shape, settings):
+    """
+    Runs in the child process: owns its own detector (and its own GIL), built
+    from the parent's detector_settings() rather than the child's config.py.
+    Protocol over the pipe:
+        child -> parent  ("ready", needs_color)
+        parent -> child  (seq, shape)        frame of `shape` is in shared memory
+        child -> parent  (seq, boxes, seconds)
+        parent -> child  None                shut down
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        detector = create_detector(settings=settings)
+        conn.send(("ready", detector.needs_color))
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            seq, frame_shape = msg
+            image = np.ndarray(frame_shape, dtype=np.uint8, buffer=shm.buf)
+            t0 = time.perf_counter()
+            if len(frame_shape) == 2:
+                boxes = detector.detect(None, image)
+            else:
+                boxes = detector.detect(image)
+            conn.send((seq, [tuple(int(v) for v in b) for b in boxes], time.perf_counter() - t0))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class ProcessDetector:
+    """
+    Face detection in a separate worker process, same detect() interface as FaceDetector.
+
+    The frame is copied into a multiprocessing.shared_memory block (one memcpy,
+    no pickling); only a tiny (seq, shape) request and the resulting boxes go
+    through the pipe. While the worker runs the cascade, the calling thread waits
+    on the pipe with the GIL released, so the face renderer and audio keep the
+    main interpreter to themselves and detection runs on another core.
+
+    If the worker dies or stops answering within `timeout`, it is killed and
+    restarted (at most once per `restart_delay`); detect() returns no faces
+    meanwhile, which the tracker treats like a missed detection.
+    """
+    needs_color = False
+
+    def __init__(self, detector_name=None, timeout=1.0, restart_delay=2.0, start_timeout=10.0):
+        self.settings = detector_settings(detector_name)  # Snapshot now: the spawned child re-imports config
+        self.timeout = timeout
+        self.restart_delay = restart_delay
+        self.start_timeout = start_timeout  # Child imports cv2 + loads the model
+        self.ctx = multiprocessing.get_context("spawn")  # Never fork the camera/audio threads
+
+        self.process = None
+        self.conn = None
+        self.shm = None
+        self.shape = None
+        self.worker_needs_color = True
+        self.seq = 0
+        self.last_start = 0.0
+
+        # Stats
+        self.requests = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.crashes = 0
+        self.last_worker_time = 0.0  # Seconds the worker spent detecting
+        self.last_round_trip = 0.0   # Seconds including copy + IPC
+
+    def _start(self, shape):
+        self._stop()
+        self.last_start = time.perf_counter()
+        self.shape = shape
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self.conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=_worker_main, name="FaceDetectWorker", daemon=True,
+                                        args=(child_conn, self.shm.name, shape, self.settings))
+        self.process.start()
+        child_conn.close()
+
+        if not self.conn.poll(self.start_timeout):
+            print("[VISION] Detector worker did not start.")
+            self._stop()
+            return False
+        try:
+            _, self.worker_needs_color = self.conn.recv()
+        except EOFError:
+            self._stop()
+            return False
+        print(f"[VISION] Detector worker running (pid {self.process.pid}).")
+        return True
+
+    def _stop(self):
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+            except Exception:
+                pass
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.join(timeout=0.5)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(timeout=0.5)
+            self.process = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def _ensure_worker(self, shape):
+        if self.process is not None and self.process.is_alive() and shape == self.shape:
+            return True
+        if self.process is not None and not self.process.is_alive():
+            # Count/log it once and free the shared memory now; the restart may be rate-limited
+            self.crashes += 1
+            print(f"[VISION] Detector worker died (exit code {self.process.exitcode}).")
+            self._stop()
+        if self.last_start and time.perf_counter() - self.last_start < self.restart_delay:
+            return False  # Don't spin restarting a worker that keeps crashing
+        if self.last_start:
+            self.restarts += 1
+        return self._start(shape)
+
+    def detect(self, frame, gray=None):
+        if not self._ensure_worker(frame.shape):
+            return []
+        # Shared memory is sized for a colour frame; a gray image fits in the same block
+        image = frame if self.worker_needs_color or gray is None else gray
+
+        t0 = time.perf_counter()
+        self.seq += 1
+        view = np.ndarray(image.shape, dtype=np.uint8, buffer=self.shm.buf)
+        np.copyto(view, image)
+        try:
+            self.conn.send((self.seq, image.shape))
+            self.requests += 1
+
+            if not self.conn.poll(self.timeout):
+                # Hung (or far too slow): kill it, a fresh worker starts on a later call
+                self.timeouts += 1
+                print("[VISION] Detector worker timed out, restarting.")
+                self._stop()
+                return []
+            seq, boxes, worker_time = self.conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
+            self.crashes += 1
+            print("[VISION] Detector worker crashed, restarting.")
+            self._stop()
+            return []
+
+        self.last_worker_time = worker_time
+        self.last_round_trip = time.perf_counter() - t0
+        return boxes
+
+    def get_stats(self):
+        return {
+            "alive": self.process is not None and self.process.is_alive(),
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "timeout_rate": self.timeouts / self.requests if self.requests else 0.0,
+            "crashes": self.crashes,
+            "restarts": self.restarts,
+            "worker_ms": self.last_worker_time * 1000.0,
+            "round_trip_ms": self.last_round_trip * 1000.0,
+        }
+
+    def close(self):
+        self._stop()
@@ -0,0 +1,135 @@
+import os
+import cv2
+import config
+
+
+class FaceDetector:
+    """
+    Base class for face detector backends.
+
+    detect() handles the multi-resolution part for every backend:
+    the frame is downscaled to each level in `scales` (coarse first),
+    the backend runs on that small image, and boxes are mapped back to
+    full-resolution (x, y, w, h). The first level that finds a face wins.
+    """
+    needs_color = False  # True if the backend wants BGR instead of grayscale
+
+    def __init__(self, scales=(1.0,), min_size=0, max_size=0):
+        self.scales = tuple(scales) or (1.0,)
+        self.min_size = min_size  # Full-resolution pixels, 0 = no limit
+        self.max_size = max_size
+
+    def detect(self, frame, gray=None):
+        if self.needs_color:
+            image = frame
+        else:
+            image = gray if gray is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        for s in self.scales:
+            if s != 1.0:
+                small = cv2.resize(image, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+            else:
+                small = image
+
+            boxes = self._detect(small, s)
+            if len(boxes) > 0:
+                return [(int(x / s), int(y / s), int(w / s), int(h / s)) for (x, y, w, h) in boxes]
+        return []
+
+    def _detect(self, image, scale):
+        """Returns a list of (x, y, w, h) in the coordinates of `image`."""
+        raise NotImplementedError
+
+
+class CascadeDetector(FaceDetector):
+    """Haar or LBP cascade (same OpenCV API, LBP is ~2-3x faster on the Pi)."""
+
+    def __init__(self, model_path, scale_factor=1.1, min_neighbors=4, **kwargs):
+        super().__init__(**kwargs)
+        self.cascade = cv2.CascadeClassifier(model_path)
+        if self.cascade.empty():
+            raise IOError(f"Could not load cascade: {model_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def _detect(self, image, scale):
+        min_px = int(self.min_size * scale)
+        max_px = int(self.max_size * scale)
+        # (0, 0) means "no limit" to OpenCV
+        faces = self.cascade.detectMultiScale(image, self.scale_factor, self.min_neighbors,
+                                              minSize=(min_px, min_px), maxSize=(max_px, max_px))
+        return [tuple(f) for f in faces]
+
+
+class YuNetDetector(FaceDetector):
+    """OpenCV DNN face detector (YuNet ONNX model from a local file)."""
+    needs_color = True
+
+    def __init__(self, model_path, score_threshold=0.8, **kwargs):
+        super().__init__(**kwargs)
+        if not os.path.exists(model_path):
+            raise IOError(f"YuNet model not found: {model_path}")
+        self.net = cv2.FaceDetectorYN.create(model_path, "", (320, 320), score_threshold, 0.3, 50)
+        self.input_size = (320, 320)
+
+    def _detect(self, image, scale):
+        size = (image.shape[1], image.shape[0])
+        if size != self.input_size:
+            self.net.setInputSize(size)
+            self.input_size = size
+
+        _, faces = self.net.detect(image)
+        if faces is None:
+            return []
+
+        min_px = self.min_size * scale
+        max_px = self.max_size * scale
+        boxes = []
+        for f in faces:
+            x, y, w, h = f[:4]
+            if min_px > 0 and w < min_px: continue
+            if max_px > 0 and w > max_px: continue
+            boxes.append((max(0, int(x)), max(0, int(y)), int(w), int(h)))
+        return boxes
+
+
+def detector_settings(name=None):
+    """
+    The config.py detector settings as a plain dict. Taken in the caller's process
+    and handed to the worker process, which would otherwise re-import config.py
+    and miss any runtime overrides (the benchmarks set these).
+    """
+    return dict(name=(name or config.FACE_DETECTOR).lower(),
+                scales=tuple(config.FACE_DETECT_SCALES),
+                min_size=config.FACE_MIN_SIZE,
+                max_size=config.FACE_MAX_SIZE,
+                yunet_score=config.FACE_YUNET_SCORE,
+                haar_model=config.FACE_HAAR_MODEL,
+                lbp_model=config.FACE_LBP_MODEL,
+                yunet_model=config.FACE_YUNET_MODEL)
+
+
+def create_detector(name=None, settings=None):
+    """
+    Builds the detector selected in config.py (or described by `settings`,
+    see detector_settings()). Falls back to the built-in Haar cascade if a
+    model file is missing.
+    """
+    settings = settings or detector_settings(name)
+    name = settings["name"]
+    common = dict(scales=settings["scales"],
+                  min_size=settings["min_size"],
+                  max_size=settings["max_size"])
+    haar_path = settings["haar_model"] or (cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+    try:
+        if name == "lbp":
+            return CascadeDetector(settings["lbp_model"], **common)
+        if name == "yunet":
+            return YuNetDetector(settings["yunet_model"], settings["yunet_score"], **common)
+        if name != "haar":
+            print(f"[VISION] Unknown detector '{name}', using haar.")
+    except Exception as e:
+        print(f"[VISION] {e}. Falling back to haar.")
+
+    return CascadeDetector(haar_path, **common)
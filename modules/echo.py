@@ -0,0 +1,246 @@
+import collections
+import math
+import threading
+import time
+import numpy as np
+
+MODES = ("off", "half_duplex", "duck", "nlms")
+
+
+class NlmsFilter:
+    """
+    Block NLMS adaptive filter: learns the speaker -> room -> mic echo path
+    from the playback reference and subtracts its estimate from the mic.
+
+    Weights are updated once per `block` samples with matrix products (no
+    per-sample Python loop), cheap enough for the mic callback thread. Speech
+    is strongly correlated sample to sample, so keep step * block small or
+    the summed update overshoots.
+    """
+
+    def __init__(self, taps=512, step=0.1, block=64):
+        self.taps = taps
+        self.step = step
+        self.block = block
+        self.weights = np.zeros(taps, dtype=np.float32)
+        self.good_weights = np.zeros(taps, dtype=np.float32)
+        self.rollbacks = 0
+
+    def process(self, mic, ref):
+        """
+        mic: N float32 samples. ref: the N + taps - 1 reference samples
+        ending at the same instant. Returns (residual, mic power, residual power).
+        """
+        out = np.empty_like(mic)
+        mic_power = 0.0
+        err_power = 0.0
+        for start in range(0, len(mic), self.block):
+            end = min(start + self.block, len(mic))
+            # Row i: the `taps` reference samples up to mic sample start+i (weights are oldest-first)
+            frames = np.lib.stride_tricks.sliding_window_view(ref[start:end + self.taps - 1], self.taps)
+            err = mic[start:end] - frames @ self.weights
+            out[start:end] = err
+
+            block_mic = float(np.dot(mic[start:end], mic[start:end]))
+            block_err = float(np.dot(err, err))
+            mic_power += block_mic
+            err_power += block_err
+
+            # Sum of the per-sample NLMS steps, each normalised by the mean input power.
+            # No update while the reference is (near) silent: nothing to learn from.
+            norm = float(np.einsum("ij,ij->", frames, frames)) / len(err)
+            if norm > self.taps:
+                self.weights += (self.step / norm) * (frames.T @ err)
+
+            if block_err * 4.0 < block_mic:
+                self.good_weights[:] = self.weights  # Cancelling >6 dB: remember these
+            elif block_err > block_mic:
+                # Made it worse (usually learned the user's voice during double-talk): roll back
+                self.weights[:] = self.good_weights
+                self.rollbacks += 1
+        return out, mic_power, err_power
+
+
+class EchoSuppressor:
+    """
+    Keeps the robot from hearing itself. Sits between the mic callback and the
+    uplink and uses what was actually sent to the speaker as a reference.
+
+    Modes:
+      off          mic passes through untouched
+      half_duplex  mic chunks are dropped while the robot's voice is audible
+      duck         mic is attenuated by `duck_gain` while the robot talks; chunks
+                   no louder than the echo the reference predicts are dropped
+      nlms         an adaptive filter subtracts the estimated echo
+    In duck / nlms mode a chunk whose voice level (before ducking, after the
+    filter) is still quiet while the robot talks is dropped too: it's only
+    echo, so uploading it costs bandwidth and can make the model answer itself.
+
+    push_reference() runs on the speaker callback thread, process() on the mic one.
+    """
+
+    def __init__(self, mode="half_duplex", mic_rate=16000, speaker_rate=24000, ref_rms=150.0,
+                 tail_ms=250, duck_gain=0.1, residual_rms=300.0, taps=512, step=0.1):
+        if mode not in MODES:
+            raise ValueError(f"Unknown echo mode: {mode} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.mic_rate = mic_rate
+        self.speaker_rate = speaker_rate
+        self.ref_rms = ref_rms            # Reference level that counts as the robot talking
+        self.tail = mic_rate * tail_ms // 1000  # Room reverb after playback stops (samples)
+        self.duck_gain = duck_gain
+        self.residual_rms = residual_rms  # Quieter than this after processing = only echo
+        self.nlms = NlmsFilter(taps, step) if mode == "nlms" else None
+        self.taps = taps if mode == "nlms" else 1
+        # Look a little ahead: if the delay estimate is too long the echo would
+        # fall outside the filter, too short only costs a few taps
+        self.lead = self.taps // 4
+
+        # Reference ring at the mic rate, addressed by absolute sample index
+        self.ring = np.zeros(mic_rate * 2, dtype=np.float32)
+        self.written = 0
+        self.read_end = None
+        self.delay_samples = 0
+        self.lock = threading.Lock()
+        self._resample_cache = {}
+
+        self.echo_left = 0  # Mic samples still treated as echo
+        self.echo_ratios = collections.deque(maxlen=64)  # Mic / reference level while the robot talks (duck)
+
+        # Stats
+        self.frames = 0
+        self.suppressed = 0
+        self.attenuated = 0
+        self.resyncs = 0
+        self.erle_db = 0.0  # Echo return loss enhancement (nlms), smoothed
+        self.last_process_time = 0.0
+
+    def set_delay(self, seconds):
+        """Speaker callback -> same sound in a mic callback: output + input latency + air."""
+        self.delay_samples = int(seconds * self.mic_rate)
+
+    def reset(self):
+        """
+        Playback was flushed (barge-in): what's left in the reference will never
+        be heard, so stop gating the mic now instead of after delay + tail.
+        The filter weights are kept: the room didn't change.
+        """
+        with self.lock:
+            self.ring[:] = 0
+            self.echo_left = 0
+
+    def _resample(self, samples):
+        """Speaker rate -> mic rate, linear interpolation (24 kHz x 480 -> 16 kHz x 320)."""
+        n = len(samples)
+        grid = self._resample_cache.get(n)
+        if grid is None:
+            out_n = n * self.mic_rate // self.speaker_rate
+            grid = (np.arange(out_n) * (self.speaker_rate / self.mic_rate), np.arange(n))
+            self._resample_cache[n] = grid
+        return np.interp(grid[0], grid[1], samples).astype(np.float32)
+
+    def push_reference(self, data):
+        """Feed every block handed to the speaker, silence included (keeps the timeline continuous)."""
+        samples = self._resample(np.frombuffer(data, dtype=np.int16))
+        size = len(self.ring)
+        with self.lock:
+            pos = self.written % size
+            first = min(len(samples), size - pos)
+            self.ring[pos:pos + first] = samples[:first]
+            if first < len(samples):
+                self.ring[:len(samples) - first] = samples[first:]
+            self.written += len(samples)
+
+    def _read(self, start, end):
+        """Reference samples [start, end) by absolute index; zeros where nothing was played."""
+        out = np.zeros(end - start, dtype=np.float32)
+        size = len(self.ring)
+        lo = max(start, self.written - size, 0)
+        hi = min(end, self.written)
+        if hi > lo:
+            pos = lo % size
+            first = min(hi - lo, size - pos)
+            out[lo - start:lo - start + first] = self.ring[pos:pos + first]
+            if first < hi - lo:
+                out[lo - start + first:hi - start] = self.ring[:hi - lo - first]
+        return out
+
+    def _aligned_reference(self, n):
+        """
+        Reference for the mic chunk that just arrived (n samples, plus taps-1 of history).
+        Consumed continuously so the filter sees a stable alignment; only re-aligned
+        when callback jitter or clock drift pushes it off by more than a chunk.
+        """
+        with self.lock:
+            target = self.written - self.delay_samples + self.lead
+            if self.read_end is None or abs(target - (self.read_end + n)) > n:
+                if self.read_end is not None:
+                    self.resyncs += 1
+                self.read_end = target
+            else:
+                self.read_end += n
+            return self._read(self.read_end - n - self.taps + 1, self.read_end)
+
+    def process(self, data, level):
+        """
+        Feed one mic chunk and its RMS. Returns (chunk to upload or None, level),
+        where level is the best estimate of the user's voice (echo removed in nlms mode).
+        """
+        self.frames += 1
+        if self.mode == "off":
+            return data, level
+
+        t0 = time.perf_counter()
+        mic = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        n = len(mic)
+        ref = self._aligned_reference(n)
+        ref_level = math.sqrt(float(np.dot(ref[-n:], ref[-n:])) / n) if n else 0.0
+        if ref_level > self.ref_rms:
+            self.echo_left = self.tail + n
+        echo_active = self.echo_left > 0
+        self.echo_left = max(0, self.echo_left - n)
+
+        out = data
+        if echo_active:
+            if self.mode == "half_duplex":
+                out = None
+            elif self.mode == "duck":
+                # Echo path gain ~ the smallest mic / reference ratio lately (echo-only chunks);
+                # the user is there when the mic is clearly (6 dB) louder than that predicts
+                if ref_level > self.ref_rms:
+                    self.echo_ratios.append(level / ref_level)
+                if self.echo_ratios and level < 2.0 * min(self.echo_ratios) * ref_level:
+                    out = None
+                else:
+                    out = (mic * self.duck_gain).astype(np.int16).tobytes()
+                    self.attenuated += 1
+            else:
+                rollbacks = self.nlms.rollbacks
+                residual, mic_power, err_power = self.nlms.process(mic, ref)
+                if mic_power > 0 and err_power > 0 and self.nlms.rollbacks == rollbacks:  # Not double-talk
+                    self.erle_db += (10.0 * math.log10(mic_power / err_power) - self.erle_db) * 0.1
+                level = math.sqrt(err_power / n)
+                out = np.clip(residual, -32768, 32767).astype(np.int16).tobytes()
+                self.attenuated += 1
+
+            # Judge the user's voice before ducking: after it, only a shout would clear the threshold
+            if out is not None and level < self.residual_rms:
+                out = None
+            if out is None:
+                self.suppressed += 1
+
+        self.last_process_time = time.perf_counter() - t0
+        return out, level
+
+    def get_stats(self):
+        return {
+            "mode": self.mode,
+            "frames": self.frames,
+            "suppressed": self.suppressed,
+            "attenuated": self.attenuated,
+            "echo_active": self.echo_left > 0,
+            "erle_db": self.erle_db,
+            "resyncs": self.resyncs,
+            "rollbacks": self.nlms.rollbacks if self.nlms is not None else 0,
+            "process_ms": self.last_process_time * 1000.0,
+        }
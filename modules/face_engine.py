@@ -1,31 +1,49 @@
 import pygame
 import random
 import math
+import os
 import time
+import hashlib
 import config
 
-# --- RESOLUTION SETTINGS ---
-# We define them here to force the exact resolution you need
-DISPLAY_WIDTH = 854
-DISPLAY_HEIGHT = 480
+# Transparent key color for cached sprites (never used by the face itself)
+COLORKEY = (255, 0, 255)
 
 
 class RobotFace:
-    def __init__(self):
+    def __init__(self, headless=None, clock=time.time):
+        """
+        headless: render into an offscreen surface instead of a window
+                  (CI, profiling on a server). Defaults to config.HEADLESS.
+        clock:    time source for blinks; tests pass a fake clock for repeatable frames.
+        """
+        self.headless = config.HEADLESS if headless is None else headless
+        self.clock = clock
+        self.width = config.SCREEN_WIDTH
+        self.height = config.SCREEN_HEIGHT
+
+        if self.headless:
+            # SDL dummy driver: events/keys still work, nothing is shown
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
         pygame.init()
 
         # --- SCREEN SETUP ---
-        # FULLSCREEN: Forces the app to take over the specific display
-        # DOUBLEBUF: Optimizes rendering for Raspberry Pi
-        flags = pygame.FULLSCREEN | pygame.DOUBLEBUF
-
-        # Initialize the screen with exactly 854x480
-        self.screen = pygame.display.set_mode((DISPLAY_WIDTH, DISPLAY_HEIGHT), flags)
-        pygame.display.set_caption("AIRA Visual System")
-
-        # --- HIDE MOUSE ---
-        # Hides the cursor so it doesn't look like a computer screen
-        pygame.mouse.set_visible(False)
+        if self.headless:
+            # Tiny dummy display only so convert() has a pixel format to match
+            pygame.display.set_mode((1, 1))
+            self.screen = pygame.Surface((self.width, self.height)).convert()
+        else:
+            # FULLSCREEN: Forces the app to take over the specific display
+            # DOUBLEBUF: Optimizes rendering for Raspberry Pi
+            flags = pygame.DOUBLEBUF
+            if config.FULLSCREEN:
+                flags |= pygame.FULLSCREEN
+            self.screen = pygame.display.set_mode((self.width, self.height), flags)
+            pygame.display.set_caption("AIRA Visual System")
+
+            # --- HIDE MOUSE ---
+            # Hides the cursor so it doesn't look like a computer screen
+            pygame.mouse.set_visible(False)
 
         # --- STATE VARIABLES ---
         self.current_state = "SLEEPING"
@@ -42,16 +60,62 @@ class RobotFace:
 
         # Mouth
         self.mouth_height = config.MOUTH_THICKNESS
-        self.talk_timer = 0
 
         # Blinking
-        self.next_blink = time.time() + 2
+        self.next_blink = self.clock() + 2
         self.is_blinking = False
         self.blink_timer = 0
 
+        # --- RENDER CACHE (Dirty Rectangles) ---
+        # Pre-rendered sclera/pupil surfaces, keyed by color / radius
+        self.sclera_cache = {}
+        self.pupil_cache = {}
+        # What each screen region looked like last frame. None = never drawn.
+        self.last_eye_key = None
+        self.last_mouth_key = None
+        self.full_redraw = True
+        self.frames_skipped = 0
+
+        # Targets from the last update() (used by is_settled)
+        self.target_mouth = self.mouth_height
+        self.target_px = 0
+        self.target_py = 0
+        self.target_lid = self.eyelid_pos
+        self.target_color = tuple(self.current_color)
+
     def lerp(self, start, end, speed, dt):
         """Standard Linear Interpolation"""
-        return start + (end - start) * speed * dt
+        # A long idle frame (FPS_MIN) must not jump a new target in one step: ease as
+        # at full rate, the draw loop speeds back up as soon as anything moves
+        return start + (end - start) * min(1.0, speed * min(dt, 2.0 / config.FPS))
+
+    def is_settled(self, lookahead=0.0):
+        """
+        True when every animated value has converged on its target and no
+        blink is due within `lookahead` seconds -> the face looks perfectly still,
+        so the draw loop can drop to its idle frame rate.
+        """
+        if self.current_state == "TALKING" or self.is_blinking:
+            return False
+        if self.current_state not in ["SLEEPING", "ERROR"] and self.clock() + lookahead >= self.next_blink:
+            return False
+
+        eps = config.FACE_SETTLE_EPSILON
+        if abs(self.mouth_height - self.target_mouth) > eps: return False
+        if abs(self.pupil_x - self.target_px) > eps: return False
+        if abs(self.pupil_y - self.target_py) > eps: return False
+        if abs(self.eyelid_pos - self.target_lid) * config.EYE_HEIGHT > eps: return False
+        for i in range(3):
+            if abs(self.current_color[i] - self.target_color[i]) > eps: return False
+
+        # Breathing never settles, but the pupil only changes when its whole-pixel
+        # size does: stay at full rate just for the frames around that step
+        if self.pupil_size(self.breathing_phase + lookahead * config.BREATH_SPEED) != self.pupil_size(self.breathing_phase):
+            return False
+        return True
+
+    def pupil_size(self, breathing_phase):
+        return int(config.PUPIL_SIZE + math.sin(breathing_phase) * 2)
 
     def update(self, dt, state, emotion, audio_volume=0.0, face_offset=None):
         self.current_state = state
@@ -65,28 +129,23 @@ class RobotFace:
             exit()
 
         # ==========================
-        # 1. MOUTH LOGIC (Instant Stop + Sine Wave)
+        # 1. MOUTH LOGIC (Lip-Sync Envelope + Instant Stop)
         # ==========================
         target_mouth = config.MOUTH_THICKNESS
 
         if state == "TALKING":
-            # Sine Wave Logic
-            self.talk_timer += dt * 18
-            wave = (math.sin(self.talk_timer) + 1) / 2
+            # Loudness of what the speaker is playing right now
+            # sqrt curve so quiet syllables still open the mouth visibly
+            level = min(1.0, audio_volume / config.LIPSYNC_FULL_SCALE) ** 0.5
 
             # Map: Min 12px, Max 55px
-            target_mouth = 12 + (wave * 43)
-
-            # Natural Jitter
-            if random.random() < 0.05:
-                target_mouth = 12
+            target_mouth = 12 + (level * 43)
         else:
-            # INSTANT STOP
-            self.talk_timer = 0
-            # Resting Smile
+            # INSTANT STOP -> Resting Smile
             if emotion == "HAPPY": target_mouth = 18
 
         self.mouth_height = self.lerp(self.mouth_height, target_mouth, 25, dt)
+        self.target_mouth = target_mouth
 
         # ==========================
         # 2. EYE TRACKING LOGIC
@@ -108,6 +167,7 @@ class RobotFace:
 
         self.pupil_x = self.lerp(self.pupil_x, target_px, 10, dt)
         self.pupil_y = self.lerp(self.pupil_y, target_py, 10, dt)
+        self.target_px, self.target_py = target_px, target_py
 
         # ==========================
         # 3. BLINK & COLORS
@@ -130,9 +190,9 @@ class RobotFace:
 
         # Blinking
         if state not in ["SLEEPING", "ERROR"]:
-            if time.time() > self.next_blink:
+            if self.clock() > self.next_blink:
                 self.is_blinking = True
-                self.next_blink = time.time() + random.uniform(3, 7)
+                self.next_blink = self.clock() + random.uniform(3, 7)
                 self.blink_timer = 0.15
 
             if self.is_blinking:
@@ -144,10 +204,13 @@ class RobotFace:
 
         self.eyelid_pos = self.lerp(self.eyelid_pos, target_lid, 20, dt)
 
+        self.target_lid = target_lid
+
         for i in range(3):
-            self.current_color[i] += (target_c[i] - self.current_color[i]) * 10 * dt
+            self.current_color[i] = self.lerp(self.current_color[i], target_c[i], 10, dt)
+        self.target_color = target_c
 
-        self.breathing_phase += dt * 2
+        self.breathing_phase += dt * config.BREATH_SPEED
 
     def draw_lashes(self, cx, cy, side, lid_y_offset):
         """
@@ -183,52 +246,129 @@ class RobotFace:
             # Draw Line (Thickness 4 for visibility)
             pygame.draw.line(self.screen, color, (start_x, start_y), (end_x, end_y), 4)
 
-    def draw(self):
-        self.screen.fill(config.COLOR_BG)
+    def get_sclera(self, color):
+        """Eye-white ellipse pre-rendered on a background tile, cached per color."""
+        sprite = self.sclera_cache.get(color)
+        if sprite is None:
+            if len(self.sclera_cache) >= config.FACE_SPRITE_CACHE_SIZE:
+                self.sclera_cache.clear()  # Color fades create many one-off entries
+            sprite = pygame.Surface((config.EYE_WIDTH, config.EYE_HEIGHT)).convert()
+            sprite.fill(config.COLOR_BG)
+            pygame.draw.ellipse(sprite, color, (0, 0, config.EYE_WIDTH, config.EYE_HEIGHT))
+            self.sclera_cache[color] = sprite
+        return sprite
+
+    def get_pupil(self, radius):
+        """Black pupil disc with a transparent (colorkey) background, cached per radius."""
+        sprite = self.pupil_cache.get(radius)
+        if sprite is None:
+            size = radius * 2 + 1
+            sprite = pygame.Surface((size, size)).convert()
+            sprite.fill(COLORKEY)
+            sprite.set_colorkey(COLORKEY)
+            pygame.draw.circle(sprite, config.COLOR_BLACK, (radius, radius), radius)
+            self.pupil_cache[radius] = sprite
+        return sprite
+
+    def eye_region(self, eye_x, eye_y):
+        """Screen area one eye can touch (sclera + lid rects + lashes sticking out above)."""
+        margin = 20  # Lids overhang 10px, lashes reach ~88px from the eye center
+        return pygame.Rect(eye_x - config.EYE_WIDTH // 2 - margin, eye_y - config.EYE_HEIGHT // 2 - 30,
+                           config.EYE_WIDTH + margin * 2, config.EYE_HEIGHT + 32)
+
+    def mouth_region(self, cx, cy):
+        """Screen area the mouth can touch at its tallest."""
+        return pygame.Rect(cx - config.MOUTH_WIDTH // 2 - 2, cy + 120 - 40, config.MOUTH_WIDTH + 4, 80)
 
+    def draw(self):
+        """
+        Dirty-rectangle renderer.
+        Only regions whose inputs changed since last frame are redrawn and pushed
+        with display.update(rects); if nothing moved the frame is skipped entirely.
+        """
         # --- CENTER CALCULATION ---
-        # Uses the hardcoded variables to ensure it is centered on 854x480
-        cx, cy = DISPLAY_WIDTH // 2, DISPLAY_HEIGHT // 2
+        cx, cy = self.width // 2, self.height // 2
+        eye_y = cy - 20
 
-        # 1. DRAW EYES
+        color = tuple(map(int, self.current_color))
+        lid_h = (config.EYE_HEIGHT / 2) * self.eyelid_pos
+        s = self.pupil_size(self.breathing_phase)
+        # Pupil blit positions exactly as drawn (keying on int(pupil_x) truncates
+        # differently for negative offsets and could leave a 1 px stale eye)
+        eyes = []
         for side in [-1, 1]:
             eye_x = cx + (side * config.EYE_SPACING // 2)
-            eye_y = cy - 20
-
-            # Sclera
-            color = tuple(map(int, self.current_color))
-            pygame.draw.ellipse(self.screen, color,
-                                (eye_x - config.EYE_WIDTH // 2, eye_y - config.EYE_HEIGHT // 2, config.EYE_WIDTH,
-                                 config.EYE_HEIGHT))
-
-            # Pupil
             px = max(eye_x - 35, min(eye_x + 35, eye_x + self.pupil_x))
             py = max(eye_y - 35, min(eye_y + 35, eye_y + self.pupil_y))
-
-            s = int(config.PUPIL_SIZE + math.sin(self.breathing_phase) * 2)
-            pygame.draw.circle(self.screen, config.COLOR_BLACK, (int(px), int(py)), s)
-
-            # Calculate Lid Heights
-            lid_h = (config.EYE_HEIGHT / 2) * self.eyelid_pos
-
-            # DRAW LASHES (Before drawing the lid rectangle, but using lid position)
-            # We want them to appear attached to the top lid
-            self.draw_lashes(cx, cy - 20, side, lid_h)
-
-            # Draw Eyelid Rectangles (Covers the eye to blink)
-            pygame.draw.rect(self.screen, config.COLOR_BG,
-                             (eye_x - config.EYE_WIDTH // 2 - 10, eye_y - config.EYE_HEIGHT // 2, config.EYE_WIDTH + 20,
-                              lid_h))
-            pygame.draw.rect(self.screen, config.COLOR_BG,
-                             (eye_x - config.EYE_WIDTH // 2 - 10, eye_y + config.EYE_HEIGHT // 2 - lid_h,
-                              config.EYE_WIDTH + 20, lid_h))
+            eyes.append((eye_x, int(px) - s, int(py) - s))
+        eye_key = (color, tuple(eyes), s, int(lid_h))
+        mouth_key = (color, int(self.mouth_height))
+
+        if self.full_redraw:
+            self.screen.fill(config.COLOR_BG)
+
+        dirty = []
+
+        # 1. DRAW EYES (Both eyes share the same inputs)
+        if self.full_redraw or eye_key != self.last_eye_key:
+            for side, (eye_x, pupil_left, pupil_top) in zip([-1, 1], eyes):
+                region = self.eye_region(eye_x, eye_y)
+                self.screen.set_clip(region)
+                self.screen.fill(config.COLOR_BG, region)
+
+                # Sclera
+                self.screen.blit(self.get_sclera(color),
+                                 (eye_x - config.EYE_WIDTH // 2, eye_y - config.EYE_HEIGHT // 2))
+
+                # Pupil
+                self.screen.blit(self.get_pupil(s), (pupil_left, pupil_top))
+
+                # DRAW LASHES (Before drawing the lid rectangle, but using lid position)
+                # We want them to appear attached to the top lid
+                self.draw_lashes(cx, eye_y, side, lid_h)
+
+                # Draw Eyelid Rectangles (Covers the eye to blink)
+                pygame.draw.rect(self.screen, config.COLOR_BG,
+                                 (eye_x - config.EYE_WIDTH // 2 - 10, eye_y - config.EYE_HEIGHT // 2,
+                                  config.EYE_WIDTH + 20, lid_h))
+                pygame.draw.rect(self.screen, config.COLOR_BG,
+                                 (eye_x - config.EYE_WIDTH // 2 - 10, eye_y + config.EYE_HEIGHT // 2 - lid_h,
+                                  config.EYE_WIDTH + 20, lid_h))
+                dirty.append(region)
+            self.last_eye_key = eye_key
 
         # 2. DRAW MOUTH
-        rect_w = config.MOUTH_WIDTH
-        rect_h = self.mouth_height
+        if self.full_redraw or mouth_key != self.last_mouth_key:
+            region = self.mouth_region(cx, cy)
+            self.screen.set_clip(region)
+            self.screen.fill(config.COLOR_BG, region)
+
+            rect_w = config.MOUTH_WIDTH
+            rect_h = self.mouth_height
+
+            # Positioned relative to center
+            mouth_rect = pygame.Rect(cx - rect_w // 2, cy + 120 - rect_h // 2, rect_w, rect_h)
+            pygame.draw.rect(self.screen, color, mouth_rect, border_radius=10)
+            dirty.append(region)
+            self.last_mouth_key = mouth_key
+
+        self.screen.set_clip(None)
+
+        if not dirty:
+            # Nothing moved (e.g. SLEEPING) -> don't touch the display at all
+            self.frames_skipped += 1
+        elif self.headless:
+            pass  # Offscreen: the surface itself is the output
+        elif self.full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        self.full_redraw = False
 
-        # Positioned relative to center
-        mouth_rect = pygame.Rect(cx - rect_w // 2, cy + 120 - rect_h // 2, rect_w, rect_h)
-        pygame.draw.rect(self.screen, tuple(map(int, self.current_color)), mouth_rect, border_radius=10)
+    def checksum(self):
+        """MD5 of the current frame's pixels (regression tests compare these)."""
+        return hashlib.md5(pygame.image.tobytes(self.screen, "RGB")).hexdigest()
 
-        pygame.display.flip()
\ No newline at end of file
+    def save_frame(self, path):
+        """Writes the current frame as an image (format from the extension, e.g. .png)."""
+        pygame.image.save(self.screen, path)
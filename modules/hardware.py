@@ -1,20 +1,36 @@
-# modules/hardware.py
-import time
+import asyncio
 import config
+from modules.servo_sim import SimulatedServoKit, SimulatedMotorDriver
 
 # Try to import hardware libraries, handle error if running on PC
 try:
-    # from adafruit_servokit import ServoKit
-    # kit = ServoKit(channels=16)
-    HARDWARE_AVAILABLE = False  # Set to True when you install libraries
-except ImportError:
+    from adafruit_servokit import ServoKit
+    HARDWARE_AVAILABLE = True
+except (ImportError, NotImplementedError, RuntimeError):  # Blinka raises the latter two off a Pi
     HARDWARE_AVAILABLE = False
     print("[INFO] Hardware libraries not found. Running in Simulation Mode.")
 
 
 class RobotBody:
-    def __init__(self):
-        self.is_connected = HARDWARE_AVAILABLE
+    def __init__(self, kit=None, motors=None):
+        # Servo driver: real PCA9685, the simulator, or nothing
+        if kit is None and HARDWARE_AVAILABLE:
+            try:
+                kit = ServoKit(channels=16)
+            except (ValueError, OSError, RuntimeError) as e:  # Library installed, but no PCA9685 answers on I2C
+                print(f"[BODY] Servo driver not found ({e}). Servos disabled.")
+        if kit is None and config.HARDWARE_SIMULATION:
+            print("[INFO] Using simulated servos/motors.")
+            kit = SimulatedServoKit(channels=16, slew_rate=config.SIM_SERVO_SLEW_RATE,
+                                    i2c_latency=config.SIM_I2C_LATENCY)
+            motors = motors or SimulatedMotorDriver()
+
+        self.kit = kit
+        self.motors = motors
+        self.is_connected = kit is not None
+
+    def set_servo(self, channel, angle):
+        self.kit.servo[channel].angle = max(0, min(180, angle))
 
     def move_head(self, x, y):
         """
@@ -25,10 +41,9 @@ class RobotBody:
             # print(f"[SIM] Moving Head to X:{x}, Y:{y}")
             return
 
-        # Example Servo Logic (Uncomment when hardware arrives)
-        # angle_x = 90 + (x * 45)
-        # kit.servo[0].angle = angle_x
-        pass
+        self.set_servo(config.SERVO_HEAD_PAN, 90 + (x * config.HEAD_PAN_RANGE))
+        if config.SERVO_HEAD_TILT is not None:
+            self.set_servo(config.SERVO_HEAD_TILT, 90 + (y * config.HEAD_TILT_RANGE))
 
     def wake_up_sequence(self):
         """Physical movements when waking up"""
@@ -42,11 +57,54 @@ class RobotBody:
         # Example: Drop head
         pass
 
-    def give_object_gesture(self):
-        """The 'Give Chocolate' movement"""
+    def drive(self, left, right):
+        """Wheel speeds from -1.0 (full reverse) to 1.0 (full forward)"""
+        if self.motors is None: return
+        self.motors.drive(left, right)
+
+    def stop_wheels(self):
+        self.drive(0.0, 0.0)
+
+    async def move_wheels(self, direction, duration):
+        """
+        Drives for `duration` seconds without blocking the event loop.
+        Always stops the motors, even if the motion is cancelled (preempted).
+        """
+        speeds = {
+            "forward": (1.0, 1.0),
+            "backward": (-1.0, -1.0),
+            "left": (-1.0, 1.0),
+            "right": (1.0, -1.0),
+        }
+        left, right = speeds.get(direction, (0.0, 0.0))
+        print(f"[BODY] Wheels {direction} for {duration}s")
+        try:
+            self.drive(left, right)
+            await asyncio.sleep(duration)
+        finally:
+            self.stop_wheels()
+
+    async def give_object_gesture(self):
+        """The 'Give Chocolate' movement (timed steps, never blocks the event loop)"""
         print("[BODY] Extending arm to give object...")
-        # 1. Raise Shoulder
-        # 2. Extend Elbow
-        # 3. Open Gripper
-        time.sleep(2)
-        print("[BODY] Motion complete.")
\ No newline at end of file
+        steps = [
+            (config.SERVO_RIGHT_ARM, 150, 1.2),  # 1. Raise the right arm (holding the object)
+            (config.SERVO_RIGHT_ARM, 120, 0.8),  # 2. Lower it towards the visitor
+        ]
+        try:
+            for channel, angle, hold in steps:
+                if self.is_connected:
+                    self.set_servo(channel, angle)
+                await asyncio.sleep(hold)
+        finally:
+            # Back to rest, even if preempted
+            if self.is_connected:
+                self.set_servo(config.SERVO_RIGHT_ARM, 90)
+        print("[BODY] Motion complete.")
+
+    async def give_chocolate_sequence(self, vision=None):
+        """Look at the visitor (if we can see one) and hand over a chocolate."""
+        if vision is not None and vision.current_face_offset:
+            x, y = vision.current_face_offset
+            self.move_head(x, -y)  # Camera y is down-positive, head y is up-positive
+        await self.give_object_gesture()
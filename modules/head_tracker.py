@@ -0,0 +1,113 @@
+import asyncio
+import math
+import time
+import config
+
+
+class OneEuroFilter:
+    """
+    1-Euro filter (Casiez et al.): heavy smoothing when the signal is slow
+    (kills Haar box jitter), light smoothing when it moves fast (no lag on real motion).
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = 0.0
+
+    @staticmethod
+    def alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, dt):
+        if self.x is None or dt <= 0:
+            self.x = x
+            return x
+
+        dx = (x - self.x) / dt
+        a_d = self.alpha(self.d_cutoff, dt)
+        self.dx = self.dx + a_d * (dx - self.dx)
+
+        cutoff = self.min_cutoff + self.beta * abs(self.dx)
+        a = self.alpha(cutoff, dt)
+        self.x = self.x + a * (x - self.x)
+        return self.x
+
+
+class HeadController:
+    """
+    Turns the face offset stream into smooth physical head motion.
+
+    The camera rides on the head, so this is a closed loop: the filtered offset
+    is the pointing error, and the head turns towards it at gain * error,
+    capped at max_speed. Inside the dead band it holds still (no hunting on
+    noisy boxes). Servo writes happen at most once per control tick, and only
+    when the position moved more than min_step, so the I2C bus isn't flooded.
+    If the face is lost for lost_timeout seconds the head drifts back to center.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.filter_x = OneEuroFilter(config.HEAD_FILTER_MIN_CUTOFF, config.HEAD_FILTER_BETA)
+        self.filter_y = OneEuroFilter(config.HEAD_FILTER_MIN_CUTOFF, config.HEAD_FILTER_BETA)
+
+        # Head position: -1..1 (x: Left..Right, y: Down..Up)
+        self.x = 0.0
+        self.y = 0.0
+        self.written = None  # Last (x, y) sent to the servos
+        self.last_seen = 0.0
+
+        # Stats
+        self.ticks = 0
+        self.writes = 0
+
+    def axis_step(self, pos, error, dt):
+        if abs(error) < config.HEAD_DEAD_BAND:
+            return pos
+        speed = max(-config.HEAD_MAX_SPEED, min(config.HEAD_MAX_SPEED, config.HEAD_GAIN * error))
+        return max(-1.0, min(1.0, pos + speed * dt))
+
+    def step(self, offset, dt, now=None):
+        """One control tick. `offset` is VisionSystem's (x, y) or None."""
+        if now is None:
+            now = time.time()
+        self.ticks += 1
+
+        if offset:
+            self.last_seen = now
+            # Camera y is down-positive, head y is up-positive
+            err_x = self.filter_x(offset[0], dt)
+            err_y = self.filter_y(-offset[1], dt)
+            self.x = self.axis_step(self.x, err_x, dt)
+            self.y = self.axis_step(self.y, err_y, dt)
+        elif now - self.last_seen > config.HEAD_LOST_TIMEOUT:
+            # Nobody there: ease back to center
+            self.filter_x.reset()
+            self.filter_y.reset()
+            self.x = self.axis_step(self.x, -self.x, dt)
+            self.y = self.axis_step(self.y, -self.y, dt)
+
+        if (self.written is None or abs(self.x - self.written[0]) >= config.HEAD_MIN_STEP
+                or (config.SERVO_HEAD_TILT is not None and abs(self.y - self.written[1]) >= config.HEAD_MIN_STEP)):
+            self.body.move_head(self.x, self.y)
+            self.written = (self.x, self.y)
+            self.writes += 1
+
+    async def run(self, get_offset):
+        """Fixed-rate control loop. `get_offset` returns the latest face offset (or None)."""
+        interval = 1.0 / config.HEAD_CONTROL_HZ
+        last = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            self.step(get_offset(), now - last)
+            last = now
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - now)))
+
+    def get_stats(self):
+        return {"position": (self.x, self.y), "ticks": self.ticks, "servo_writes": self.writes}
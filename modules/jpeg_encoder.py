@@ -0,0 +1,94 @@
+import io
+import cv2
+import numpy as np
+
+# Optional faster encoders (use them if installed, otherwise fall back to OpenCV)
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    TURBOJPEG_AVAILABLE = True
+except Exception:
+    TURBOJPEG_AVAILABLE = False
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+def available_backends():
+    backends = ["opencv"]
+    if TURBOJPEG_AVAILABLE: backends.append("turbojpeg")
+    if PIL_AVAILABLE: backends.append("pil")
+    return backends
+
+
+class JpegEncoder:
+    """
+    BGR frame -> JPEG, with configurable output size and quality.
+
+    Backends:
+      "opencv"    cv2.imencode (always available)
+      "turbojpeg" libjpeg-turbo via PyTurboJPEG (fastest on the Pi, 4:2:0 subsampling)
+      "pil"       Pillow
+      "auto"      turbojpeg if installed, else opencv
+
+    The downscale and colour-conversion buffers are allocated once per frame
+    shape and reused. The encoded JPEG itself is always a fresh allocation
+    (none of the libraries can write into a caller's buffer); encode() returns
+    it as bytes, so turbojpeg / pil need no copy and opencv exactly one.
+    """
+
+    def __init__(self, backend="auto", quality=50, max_side=0):
+        if backend == "auto":
+            backend = "turbojpeg" if TURBOJPEG_AVAILABLE else "opencv"
+        if backend not in available_backends():
+            print(f"[VISION] JPEG backend '{backend}' not installed, using opencv.")
+            backend = "opencv"
+
+        self.turbo = None
+        if backend == "turbojpeg":
+            try:
+                self.turbo = TurboJPEG()
+            except (OSError, RuntimeError) as e:  # The wheel is there, libturbojpeg isn't
+                print(f"[VISION] turbojpeg unusable ({e}), using opencv.")
+                backend = "opencv"
+
+        self.backend = backend
+        self.quality = quality
+        self.max_side = max_side  # 0 = keep input size
+
+        self.resize_buf = None
+        self.rgb_buf = None
+
+    def _scaled(self, frame):
+        longest = max(frame.shape[0], frame.shape[1])
+        if not self.max_side or longest <= self.max_side:
+            return frame
+
+        s = self.max_side / float(longest)
+        size = (max(1, int(frame.shape[1] * s)), max(1, int(frame.shape[0] * s)))
+        if self.resize_buf is None or self.resize_buf.shape[:2] != (size[1], size[0]):
+            self.resize_buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        # INTER_AREA is slow for non-integer ratios; mild downscales barely alias with LINEAR
+        interpolation = cv2.INTER_LINEAR if s > 0.5 else cv2.INTER_AREA
+        cv2.resize(frame, size, dst=self.resize_buf, interpolation=interpolation)
+        return self.resize_buf
+
+    def encode(self, frame):
+        """Returns the JPEG as bytes, or None on failure."""
+        image = self._scaled(frame)
+
+        if self.backend == "turbojpeg":
+            return self.turbo.encode(np.ascontiguousarray(image), quality=self.quality,
+                                     pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+        if self.backend == "pil":
+            if self.rgb_buf is None or self.rgb_buf.shape != image.shape:
+                self.rgb_buf = np.empty_like(image)
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.rgb_buf)
+            out = io.BytesIO()
+            Image.fromarray(self.rgb_buf).save(out, "JPEG", quality=self.quality)
+            return out.getvalue()
+
+        ok, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+        return buffer.tobytes() if ok else None
@@ -0,0 +1,53 @@
+import time
+
+
+class LoudnessEnvelope:
+    """
+    Timestamped loudness ring for lip-sync.
+
+    The speaker callback publishes one value per output block, stamped with the
+    time that block will actually leave the speaker (callback time + output latency).
+    The face samples it at 60 FPS with sample(): a couple of list reads, no locks.
+    Single writer: the count is bumped only after the slot is filled, so a reader
+    never sees a half-written entry.
+    """
+
+    def __init__(self, size=64, release=0.6, max_age=0.25):
+        self.size = size
+        self.max_age = max_age
+        self.release = release  # Per-block decay: smooths gaps between words
+        self.times = [0.0] * size
+        self.values = [0.0] * size
+        self.count = 0
+        self.level = 0.0
+
+    def publish(self, play_time, rms):
+        """Called from the playback thread. Fast attack, exponential release."""
+        self.level = max(rms, self.level * self.release)
+        if self.level < 1.0:
+            self.level = 0.0
+
+        i = self.count % self.size
+        self.times[i] = play_time
+        self.values[i] = self.level
+        self.count += 1
+
+    def sample(self, now=None):
+        """Loudness of the audio audible right now (0.0 if nothing is playing)."""
+        if now is None:
+            now = time.perf_counter()
+
+        count = self.count
+        # Walk back from the newest block to the one that is playing now
+        for k in range(1, min(count, self.size) + 1):
+            i = (count - k) % self.size
+            if self.times[i] <= now:
+                # Stale (stream stopped publishing)? Then nothing is audible.
+                return self.values[i] if now - self.times[i] < self.max_age else 0.0
+        return 0.0
+
+    def reset(self):
+        self.level = 0.0
+        count = self.count
+        for k in range(1, min(count, self.size) + 1):
+            self.values[(count - k) % self.size] = 0.0
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+
+
+class RollingHistogram:
+    """Last `size` samples in a ring; percentiles are computed only when asked for."""
+
+    def __init__(self, size=512):
+        self.size = size
+        self.samples = []
+        self.index = 0
+        self.count = 0
+
+    def observe(self, value):
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            self.samples[self.index] = value
+            self.index = (self.index + 1) % self.size
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        n = len(ordered)
+        return {
+            "count": self.count,
+            "mean": sum(ordered) / n,
+            "p50": ordered[n // 2],
+            "p95": ordered[min(n - 1, int(n * 0.95))],
+            "p99": ordered[min(n - 1, int(n * 0.99))],
+            "max": ordered[-1],
+        }
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+class Metrics:
+    """
+    Built-in health metrics for AIRARobot.
+
+    observe(name, value) -> rolling histogram (durations in ms)
+    count(name, n)       -> monotonically increasing counter (bytes, frames...)
+    add_source(name, fn) -> fn() returns a dict of gauges (buffer fill, VAD counters...)
+
+    Exposed as a periodic "[METRICS]" log line and/or a tiny local HTTP endpoint
+    (GET / -> JSON). When disabled, observe()/count() are no-op functions, so the
+    instrumented loops pay one function call and nothing else.
+    """
+
+    def __init__(self, enabled=False, history=512):
+        self.enabled = enabled
+        self.history = history
+        self.histograms = {}
+        self.counters = {}
+        self.sources = {}
+        self.started = time.time()
+
+        if not enabled:
+            self.observe = _noop
+            self.count = _noop
+
+    def observe(self, name, value):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = RollingHistogram(self.history)
+        hist.observe(value)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_source(self, name, fn):
+        self.sources[name] = fn
+
+    def snapshot(self):
+        gauges = {}
+        for name, fn in self.sources.items():
+            try:
+                gauges[name] = fn()
+            except Exception as e:
+                gauges[name] = {"error": str(e)}
+        return {
+            "uptime_s": time.time() - self.started,
+            "histograms_ms": {name: h.summary() for name, h in self.histograms.items()},
+            "counters": dict(self.counters),
+            "gauges": gauges,
+        }
+
+    def format_line(self):
+        """One compact log line: p50/p95 of every histogram plus the counters."""
+        parts = []
+        for name, h in sorted(self.histograms.items()):
+            s = h.summary()
+            if s["count"]:
+                parts.append(f"{name}={s['p50']:.1f}/{s['p95']:.1f}")
+        for name, value in sorted(self.counters.items()):
+            parts.append(f"{name}={value}")
+        return "[METRICS] " + " ".join(parts)
+
+    async def monitor_loop_lag(self, interval=0.05):
+        """Event-loop lag: how late a sleep(interval) wakes up."""
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.observe("loop_lag", (time.perf_counter() - t0 - interval) * 1000.0)
+
+    async def log_loop(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.format_line())
+
+    async def _handle_http(self, reader, writer):
+        try:
+            request = await reader.readline()
+            # Drain headers
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if request.startswith(b"GET /text"):
+                body, ctype = self.format_line().encode(), "text/plain"
+            else:
+                body, ctype = json.dumps(self.snapshot(), indent=2, default=str).encode(), "application/json"
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: " + ctype.encode() +
+                         b"\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        """Local endpoint: curl http://127.0.0.1:<port>/ (JSON) or /text."""
+        server = await asyncio.start_server(self._handle_http, host, port)
+        print(f"[METRICS] Serving on http://{host}:{port}/")
+        async with server:
+            await server.serve_forever()
+
+    def start_tasks(self, log_interval=0, http_port=0, host="127.0.0.1"):
+        """Starts the background metric tasks (nothing when disabled)."""
+        if not self.enabled:
+            return []
+        tasks = [asyncio.create_task(self.monitor_loop_lag())]
+        if log_interval:
+            tasks.append(asyncio.create_task(self.log_loop(log_interval)))
+        if http_port:
+            tasks.append(asyncio.create_task(self.serve(host, http_port)))
+        return tasks
@@ -0,0 +1,116 @@
+import collections
+import threading
+import time
+
+
+class SimulatedServo:
+    """Stand-in for adafruit_motor.servo.Servo: same `.angle` property, plus a slew model."""
+
+    def __init__(self, kit, channel, slew_rate, start_angle=90.0):
+        self.kit = kit
+        self.channel = channel
+        self.slew_rate = slew_rate  # deg/s the horn can actually turn
+
+        self._commanded = start_angle
+        self._move_start = 0.0  # When the current move began
+        self._move_from = start_angle
+
+    @property
+    def angle(self):
+        return self._commanded
+
+    @angle.setter
+    def angle(self, value):
+        value = max(0.0, min(180.0, float(value)))
+        self.kit._write(self, value)
+
+    def position(self, t=None):
+        """Where the horn physically is at time t (perf_counter seconds)."""
+        if t is None:
+            t = time.perf_counter()
+        travelled = self.slew_rate * max(0.0, t - self._move_start)
+        delta = self._commanded - self._move_from
+        if abs(delta) <= travelled:
+            return self._commanded
+        return self._move_from + travelled * (1 if delta > 0 else -1)
+
+    def _start_move(self, t, target):
+        self._move_from = self.position(t)
+        self._move_start = t
+        self._commanded = target
+
+
+class SimulatedServoKit:
+    """
+    Drop-in for adafruit_servokit.ServoKit(channels=16).
+
+    Models what matters for latency on the real robot:
+      - I2C write latency: every write holds the single shared bus (and blocks
+        the caller, like the real library) for `i2c_latency` seconds.
+      - Command queuing: writes from several tasks/threads wait for the bus.
+      - Slew rate: servos reach their target some time after the write.
+    Every write is recorded in `timeline` as
+    (t_command, t_written, channel, from_angle, commanded_angle, t_reached).
+    """
+
+    def __init__(self, channels=16, slew_rate=300.0, i2c_latency=0.0008, timeline_size=10000):
+        self.i2c_latency = i2c_latency
+        self.bus_lock = threading.Lock()
+        self.servo = [SimulatedServo(self, ch, slew_rate) for ch in range(channels)]
+        self.timeline = collections.deque(maxlen=timeline_size)
+
+        # Stats
+        self.writes = 0
+        self.bus_wait_total = 0.0  # Time writes spent queued behind other writes
+        self.bus_wait_max = 0.0
+        self.bus_busy_total = 0.0
+
+    def _write(self, servo, angle):
+        t_command = time.perf_counter()
+        with self.bus_lock:
+            t_start = time.perf_counter()
+            time.sleep(self.i2c_latency)  # PCA9685 register write over I2C
+            t_written = time.perf_counter()
+
+        from_angle = servo.position(t_written)
+        servo._start_move(t_written, angle)
+        t_reached = t_written + abs(angle - from_angle) / servo.slew_rate
+
+        wait = t_start - t_command
+        self.writes += 1
+        self.bus_wait_total += wait
+        self.bus_wait_max = max(self.bus_wait_max, wait)
+        self.bus_busy_total += t_written - t_start
+        self.timeline.append((t_command, t_written, servo.channel, from_angle, angle, t_reached))
+
+    def report(self, elapsed=None):
+        """Summary dict for benchmarks / logs."""
+        stats = {
+            "writes": self.writes,
+            "bus_wait_avg_ms": (self.bus_wait_total / self.writes * 1000.0) if self.writes else 0.0,
+            "bus_wait_max_ms": self.bus_wait_max * 1000.0,
+        }
+        if elapsed:
+            stats["writes_per_s"] = self.writes / elapsed
+            stats["bus_utilisation"] = self.bus_busy_total / elapsed
+        return stats
+
+    def dump_timeline(self, path):
+        with open(path, "w") as f:
+            f.write("t_command,t_written,channel,from_angle,commanded_angle,t_reached\n")
+            for row in self.timeline:
+                f.write(",".join(f"{v:.6f}" if isinstance(v, float) else str(v) for v in row) + "\n")
+
+
+class SimulatedMotorDriver:
+    """Stand-in for the BTS7960 wheel drivers: records every speed command."""
+
+    def __init__(self, timeline_size=10000):
+        self.left = 0.0
+        self.right = 0.0
+        self.timeline = collections.deque(maxlen=timeline_size)  # (t, left, right)
+
+    def drive(self, left, right):
+        self.left = max(-1.0, min(1.0, left))
+        self.right = max(-1.0, min(1.0, right))
+        self.timeline.append((time.perf_counter(), self.left, self.right))
@@ -0,0 +1,300 @@
+import asyncio
+import contextlib
+import json
+import time
+from modules.audio_sources import read_wav, synth_speech
+
+
+class GeminiConnector:
+    """
+    Opens real Gemini Live sessions (needs network + GOOGLE_API_KEY).
+
+    Every connector has the same shape: `async with connector.connect() as session`
+    yields an object with send_realtime_input(...) and an async receive() generator,
+    so AIRARobot doesn't care whether it talks to Google or to ReplayConnector.
+    """
+
+    def __init__(self, api_key, model, system_instruction, resumption=True):
+        # Imported here so the offline replay harness runs without the SDK
+        from google import genai
+        from google.genai.types import LiveConnectConfig, Content, Part, SessionResumptionConfig
+
+        self.model = model
+        self.client = genai.Client(api_key=api_key, http_options={'api_version': 'v1alpha'})
+        self.resumption = resumption
+        self.SessionResumptionConfig = SessionResumptionConfig
+        self.live_config = LiveConnectConfig(
+            response_modalities=["AUDIO"],
+            system_instruction=Content(parts=[Part(text=system_instruction)]),
+            # Ask the server for resumption handles (session_resumption_update messages)
+            session_resumption=SessionResumptionConfig() if resumption else None
+        )
+
+    def connect(self, resume_handle=None):
+        live_config = self.live_config
+        if resume_handle and self.resumption:
+            live_config = live_config.model_copy(
+                update={"session_resumption": self.SessionResumptionConfig(handle=resume_handle)})
+        return self.client.aio.live.connect(model=self.model, config=live_config)
+
+
+# --- Local stand-in for the Live API ---
+
+DEFAULT_SCRIPT = {
+    "loop": True,
+    "turns": [
+        {"delay": 0.35, "events": [
+            {"text": "[HAP"}, {"text": "PY] Namaste Hajur! "},
+            {"audio_ms": 1800},
+        ]},
+        {"delay": 0.40, "events": [
+            {"text": "[LOVE] Lu hajur, mitho chocolate! "},
+            {"audio_ms": 1200},
+            {"text": "[ACTION:GIVE_CHOCOLATE]"},
+        ]},
+        {"delay": 0.30, "events": [
+            {"text": "[NEUTRAL] Huss! "},
+            {"audio_ms": 900},
+            {"text": "[ACTION:MOVE_FORWARD]"},
+        ]},
+    ],
+}
+
+
+def load_script(path=None):
+    """Reads a replay script (JSON). None -> the built-in demo conversation."""
+    if path is None:
+        return DEFAULT_SCRIPT
+    with open(path) as f:
+        return json.load(f)
+
+
+class ReplayServerContent:
+    def __init__(self, turn_complete=False, interrupted=False):
+        self.turn_complete = turn_complete
+        self.interrupted = interrupted
+
+
+class ReplayResumptionUpdate:
+    def __init__(self, new_handle):
+        self.new_handle = new_handle
+        self.resumable = True
+
+
+class ReplayMessage:
+    """Same fields AIRARobot reads from a LiveServerMessage."""
+
+    def __init__(self, data=None, text=None, turn_complete=False, interrupted=False, resume_handle=None):
+        self.data = data
+        self.text = text
+        self.server_content = None
+        if turn_complete or interrupted:
+            self.server_content = ReplayServerContent(turn_complete, interrupted)
+        self.session_resumption_update = ReplayResumptionUpdate(resume_handle) if resume_handle else None
+        self.go_away = None
+
+
+class ReplaySession:
+    """
+    Scripted Live session. Each reply turn starts when the client signals the end
+    of the user's speech (audio_stream_end, sent when the VAD gate closes) or,
+    if the script sets "interval", every `interval` seconds regardless.
+
+    A turn waits `delay` seconds (the simulated model latency), then plays its
+    events in order:
+        {"text": "..."}                 text chunk (tags may be split across chunks)
+        {"audio_ms": 1500}              synthetic speech, cut into chunk_ms pieces
+        {"audio": "reply.wav"}          16-bit mono WAV at SPEAKER_RATE, same chunking
+        {"sleep": 0.2}                  gap in the stream
+    and finishes with turn_complete. Audio chunks are spaced `chunk_interval`
+    apart (default: twice real time, roughly what the real service does).
+
+    Barge-in: user audio arriving while a reply is still streaming cancels it
+    and sends `interrupted`, like the Live API's server-side VAD
+    (disable with "interruptible": false).
+
+    Flaky networks: with "disconnect_after" set, the session drops that many
+    seconds after opening. A resumption handle is issued after every turn;
+    reconnecting with it carries on with the next scripted turn.
+    """
+
+    def __init__(self, script, rate=24000, name="replay", start_turn=0):
+        self.script = script
+        self.rate = rate
+        self.name = name
+        self.turns = script.get("turns", [])
+        self.loop_turns = script.get("loop", True)
+        self.interval = script.get("interval", 0)
+        self.chunk_ms = script.get("chunk_ms", 40)
+        self.chunk_interval = script.get("chunk_interval", self.chunk_ms / 2000.0)
+
+        self.outbox = asyncio.Queue()
+        self.turn_task = None
+        self.timer_task = None
+        self.next_turn = start_turn
+        self.disconnect_after = script.get("disconnect_after", 0)
+        self.interruptible = script.get("interruptible", True)
+        self.opened_at = time.time()
+        self.closed = False
+        self._audio_cache = {}
+
+        # What the client sent us / what we played back
+        self.audio_bytes_in = 0
+        self.audio_chunks_in = 0
+        self.images_in = 0
+        self.image_bytes_in = 0
+        self.turns_played = 0
+        self.turns_interrupted = 0
+        self.turn_log = []  # (requested_at, first_chunk_at, completed_at) per turn, time.time()
+
+    def start(self):
+        if self.interval > 0:
+            self.timer_task = asyncio.create_task(self._timer())
+        if self.disconnect_after > 0:
+            asyncio.get_running_loop().call_later(self.disconnect_after, self.drop)
+
+    def drop(self):
+        """Simulates the network dropping the session."""
+        if not self.closed:
+            print("[REPLAY] Dropping session (simulated network failure)")
+            self.close()
+
+    def close(self):
+        self.closed = True
+        for task in (self.turn_task, self.timer_task):
+            if task is not None:
+                task.cancel()
+        self.outbox.put_nowait(None)
+
+    async def send_realtime_input(self, media=None, audio_stream_end=None, **kwargs):
+        if self.closed:
+            raise ConnectionError("Replay session closed")
+        if media is not None:
+            mime = media.get("mime_type", "")
+            data = media.get("data") or b""
+            if mime.startswith("audio/"):
+                self.audio_bytes_in += len(data)
+                self.audio_chunks_in += 1
+                if self.interruptible and self.turn_task is not None and not self.turn_task.done():
+                    self.interrupt_turn()
+            elif mime.startswith("image/"):
+                self.images_in += 1
+                self.image_bytes_in += len(data)
+        if audio_stream_end:
+            self.request_turn()
+
+    def request_turn(self):
+        """Starts the next scripted reply (ignored while one is still streaming)."""
+        if self.turn_task is not None and not self.turn_task.done():
+            return
+        if self.next_turn >= len(self.turns):
+            if not self.loop_turns or not self.turns:
+                return
+            self.next_turn = 0
+        turn = self.turns[self.next_turn]
+        self.next_turn += 1
+        self.turn_task = asyncio.create_task(self._play_turn(turn))
+
+    def interrupt_turn(self):
+        """User spoke over the reply: stop generating and tell the client."""
+        self.turn_task.cancel()
+        self.turn_task = None
+        self.turns_interrupted += 1
+        self.outbox.put_nowait(ReplayMessage(interrupted=True))
+
+    async def _timer(self):
+        while not self.closed:
+            await asyncio.sleep(self.interval)
+            self.request_turn()
+
+    def _audio(self, event):
+        key = event.get("audio") or event.get("audio_ms")
+        if key not in self._audio_cache:
+            if "audio" in event:
+                pcm, rate = read_wav(event["audio"])
+                if rate != self.rate:
+                    print(f"[REPLAY] {event['audio']} is {rate} Hz, expected {self.rate} Hz")
+            else:
+                pcm = synth_speech(event["audio_ms"], self.rate, seed=len(self._audio_cache))
+            self._audio_cache[key] = pcm
+        return self._audio_cache[key]
+
+    async def _play_turn(self, turn):
+        log = [time.time(), None, None]
+        self.turn_log.append(log)
+        await asyncio.sleep(turn.get("delay", 0.0))
+
+        chunk_bytes = self.rate * 2 * self.chunk_ms // 1000
+        for event in turn.get("events", []):
+            if "sleep" in event:
+                await asyncio.sleep(event["sleep"])
+            elif "text" in event:
+                self._emit(log, ReplayMessage(text=event["text"]))
+            elif "audio" in event or "audio_ms" in event:
+                pcm = self._audio(event)
+                for i in range(0, len(pcm), chunk_bytes):
+                    self._emit(log, ReplayMessage(data=pcm[i:i + chunk_bytes]))
+                    await asyncio.sleep(self.chunk_interval)
+
+        self.outbox.put_nowait(ReplayMessage(turn_complete=True))
+        self.outbox.put_nowait(ReplayMessage(resume_handle=f"{self.name}:{self.next_turn}"))
+        log[2] = time.time()
+        self.turns_played += 1
+
+    def _emit(self, log, message):
+        if log[1] is None:
+            log[1] = time.time()
+        self.outbox.put_nowait(message)
+
+    async def receive(self):
+        """Yields messages until the end of the current turn (like the SDK)."""
+        while True:
+            message = await self.outbox.get()
+            if message is None:
+                raise ConnectionError("Replay session closed")
+            yield message
+            if message.server_content and message.server_content.turn_complete:
+                return
+
+    def get_stats(self):
+        latencies = [(first - req) * 1000.0 for req, first, _ in self.turn_log if first is not None]
+        return {
+            "turns": self.turns_played,
+            "interrupted": self.turns_interrupted,
+            "audio_in_bytes": self.audio_bytes_in,
+            "images_in": self.images_in,
+            "image_in_bytes": self.image_bytes_in,
+            "first_chunk_ms": latencies,
+        }
+
+
+class ReplayConnector:
+    """Drop-in for GeminiConnector that never touches the network."""
+
+    def __init__(self, script=None, rate=24000):
+        self.script = script or DEFAULT_SCRIPT
+        self.rate = rate
+        self.session = None  # Last opened session (for benchmarks to inspect)
+        self.sessions = []
+        self.connects = 0
+        self.resumed = 0
+
+    @contextlib.asynccontextmanager
+    async def connect(self, resume_handle=None):
+        start_turn = 0
+        if resume_handle:
+            # "name:turn" -> carry on with the conversation where it stopped
+            start_turn = int(resume_handle.rsplit(":", 1)[1])
+            self.resumed += 1
+        self.connects += 1
+        session = ReplaySession(self.script, self.rate, f"replay{self.connects}", start_turn)
+        self.session = session
+        self.sessions.append(session)
+        session.start()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def turns_played(self):
+        return sum(s.turns_played for s in self.sessions)
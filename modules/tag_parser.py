@@ -0,0 +1,105 @@
+import collections
+import time
+
+# Emotion tags the system prompt asks Gemini to start every reply with
+EMOTION_TAGS = ("HAPPY", "SAD", "NEUTRAL", "SURPRISED", "ANGRY", "LOVE")
+
+# kind: "emotion" / "action", name: e.g. "HAPPY" / "GIVE_CHOCOLATE"
+TagEvent = collections.namedtuple("TagEvent", ["kind", "name", "timestamp"])
+
+
+class TagParser:
+    """
+    Incremental parser for [EMOTION] and [ACTION:...] tags in streamed text.
+
+    feed() takes text fragments exactly as they arrive, so a tag split across
+    chunks ("[ACTION:GIVE_" + "CHOCOLATE]") is still recognised. Only the
+    partial tag is buffered, and at most max_tag_length chars of it, so memory
+    is bounded and each character is scanned once (O(n)).
+
+    Tags are table-driven: register() maps a token to an event. Tokens marked
+    once_per_turn (actions) fire at most once until end_turn(), so repeated
+    text can't hand out five chocolates.
+    """
+
+    def __init__(self, max_tag_length=48):
+        self.max_tag_length = max_tag_length
+        self.registry = {}  # token -> (kind, name, once_per_turn)
+        self.seen = set()  # once_per_turn tokens already fired this turn
+
+        self.inside = False  # Between '[' and ']'
+        self.partial = ""
+
+    def register(self, token, kind, name=None, once_per_turn=False):
+        self.registry[token.upper()] = (kind, name or token.upper(), once_per_turn)
+
+    def register_emotion(self, name):
+        self.register(name, "emotion")
+
+    def register_action(self, name):
+        self.register("ACTION:" + name, "action", name=name.upper(), once_per_turn=True)
+
+    def feed(self, text):
+        """Consumes one streamed fragment. Returns the list of TagEvents it completed."""
+        events = []
+        pos = 0
+        n = len(text)
+
+        while pos < n:
+            if not self.inside:
+                start = text.find("[", pos)
+                if start < 0:
+                    break
+                self.inside = True
+                self.partial = ""
+                pos = start + 1
+
+            # A tag can't be longer than max_tag_length, so never scan further than that
+            limit = min(n, pos + self.max_tag_length - len(self.partial) + 1)
+            end = text.find("]", pos, limit)
+            reopen = text.find("[", pos, end if end >= 0 else limit)
+            if reopen >= 0:
+                # "[abc [HAPPY]" -> the first bracket was just text; restart at the new one
+                self.partial = ""
+                pos = reopen + 1
+                continue
+
+            if end < 0:
+                if len(self.partial) + limit - pos > self.max_tag_length:
+                    # Too long to be a tag: just a bracket in speech
+                    self.inside = False
+                    self.partial = ""
+                    pos = limit
+                    continue
+                # Tag continues in the next fragment
+                self.partial += text[pos:]
+                break
+
+            self.partial += text[pos:end]
+            pos = end + 1
+            self.inside = False
+            event = self._resolve(self.partial)
+            if event is not None:
+                events.append(event)
+            self.partial = ""
+
+        return events
+
+    def _resolve(self, raw):
+        token = raw.strip().upper().replace(" ", "")
+        entry = self.registry.get(token)
+        if entry is None:
+            return None
+
+        kind, name, once = entry
+        if once:
+            if token in self.seen:
+                return None
+            self.seen.add(token)
+        return TagEvent(kind, name, time.time())
+
+    def end_turn(self):
+        """Model finished its reply: actions may fire again, drop any half tag."""
+        self.seen.clear()
+        self.inside = False
+        self.partial = ""
@@ -0,0 +1,102 @@
+import collections
+import time
+import cv2
+import numpy as np
+import config
+from modules.jpeg_encoder import JpegEncoder
+
+
+class ImageUplink:
+    """
+    Decides WHEN and WHAT camera image goes to the Live session.
+
+    - Checked on a fixed cadence (config.IMAGE_UPLINK_INTERVAL).
+    - "adaptive" mode skips frames whose 64-bit difference hash barely changed,
+      but still sends a keep-alive every IMAGE_UPLINK_MAX_INTERVAL seconds.
+    - When a face is being tracked the image is cropped around it, then
+      downsized so the longest side is at most IMAGE_UPLINK_MAX_SIDE.
+    - Tracks bytes sent over the last minute.
+    """
+
+    def __init__(self, vision):
+        self.vision = vision
+        self.encoder = JpegEncoder(config.JPEG_BACKEND, config.IMAGE_UPLINK_QUALITY, config.IMAGE_UPLINK_MAX_SIDE)
+        self.last_index = -1
+        self.last_hash = None
+        self.last_sent_time = 0.0
+
+        # Stats
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.history = collections.deque()  # (time, nbytes) within the last 60 s
+
+    @staticmethod
+    def dhash(gray):
+        """64-bit difference hash: is each pixel brighter than its right neighbour (9x8 thumbnail)."""
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def crop_region(self, shape):
+        """Area around the tracked face (with context), or None for the full frame."""
+        box = self.vision.current_face_box
+        if not config.IMAGE_UPLINK_FACE_CROP or box is None:
+            return None
+
+        x, y, w, h = box
+        cx, cy = x + w / 2.0, y + h / 2.0
+        half = max(w, h) * config.IMAGE_UPLINK_CROP_SCALE / 2.0
+        x0, y0 = int(max(0, cx - half)), int(max(0, cy - half))
+        x1, y1 = int(min(shape[1], cx + half)), int(min(shape[0], cy + half))
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        return (x0, y0, x1, y1)
+
+    def prepare(self):
+        """
+        Returns the JPEG bytes to send now, or None to skip this tick.
+        Runs in a worker thread (resize + encode are the slow bits).
+        """
+        frame, index, _ = self.vision.get_latest_frame()
+        if frame is None or index == self.last_index:
+            return None
+        self.last_index = index
+        now = time.time()
+
+        if config.IMAGE_UPLINK_MODE == "adaptive":
+            h = self.dhash(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            changed = self.last_hash is None or bin(h ^ self.last_hash).count("1") >= config.IMAGE_UPLINK_HASH_THRESHOLD
+            if not changed and now - self.last_sent_time < config.IMAGE_UPLINK_MAX_INTERVAL:
+                self.frames_skipped += 1
+                return None
+            self.last_hash = h
+
+        region = self.crop_region(frame.shape)
+        if region is not None:
+            x0, y0, x1, y1 = region
+            frame = frame[y0:y1, x0:x1]
+
+        # Downsize + encode (reused resize buffer)
+        jpeg = self.encoder.encode(frame)
+        if jpeg is None:
+            return None
+        self.last_sent_time = now
+        return jpeg
+
+    def record_sent(self, nbytes):
+        now = time.time()
+        self.frames_sent += 1
+        self.history.append((now, nbytes))
+        while self.history and now - self.history[0][0] > 60.0:
+            self.history.popleft()
+
+    def bytes_per_minute(self):
+        now = time.time()
+        return sum(n for t, n in self.history if now - t <= 60.0)
+
+    def get_stats(self):
+        return {
+            "sent": self.frames_sent,
+            "skipped": self.frames_skipped,
+            "bytes_per_minute": self.bytes_per_minute(),
+        }
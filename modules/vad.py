@@ -0,0 +1,159 @@
+import collections
+import time
+import numpy as np
+from modules.audio_features import AudioFeatures
+
+
+class VoiceActivityGate:
+    """
+    Local VAD between the mic and the Live session uplink.
+
+    A chunk counts as speech when
+      1. its energy is well above the tracked noise floor, and
+      2. enough of that energy sits in the speech band (300-3400 Hz),
+         which rejects rumble, fans and clatter at a busy venue.
+
+    The noise floor follows every non-speech chunk (falling fast, rising
+    slowly) and can never sit below the quietest chunk of the last
+    `noise_window` chunks heard while the gate was closed (minimum
+    statistics). The window is frozen while someone talks, so a long utterance
+    never becomes its own noise floor; a "voice" that keeps the gate open for
+    more than `max_open_chunks` without a pause is a steady noise bed, such as
+    crowd babble, and feeds the window again so the floor rises to it.
+
+    Hangover keeps the gate open for a few chunks after speech stops so word
+    endings aren't clipped; a small pre-roll buffer replays the chunks just
+    before speech started so word onsets aren't clipped either.
+    """
+
+    def __init__(self, rate=16000, threshold_ratio=3.0, min_rms=300.0, band_ratio=0.5,
+                 hangover_chunks=8, preroll_chunks=3, noise_adapt=0.05, noise_window=47,
+                 max_open_chunks=188):
+        self.rate = rate
+        self.threshold_ratio = threshold_ratio  # Speech must be this many times above the noise floor
+        self.min_rms = min_rms                  # ...and at least this loud
+        self.band_ratio = band_ratio            # Min fraction of energy in the speech band
+        self.hangover_chunks = hangover_chunks
+        self.noise_adapt = noise_adapt          # How fast the noise floor follows silence
+        self.max_open_chunks = max_open_chunks  # Longer without a pause = noise bed, not a person
+
+        self.features = AudioFeatures()
+        self.preroll = collections.deque(maxlen=preroll_chunks)
+        self.recent_levels = collections.deque(maxlen=noise_window)  # For the minimum-statistics floor
+        self.noise_floor = min_rms / threshold_ratio
+        self.hangover = 0
+        self.is_speech = False
+        self.open_chunks = 0  # Chunks since the gate opened
+        self._band_mask = None
+
+        # Timestamps for latency metrics
+        self.speech_started_at = 0.0
+        self.speech_ended_at = 0.0  # Last chunk classified as speech, not when the hangover ran out
+        self.last_speech_at = 0.0
+
+        # Stats
+        self.frames_sent = 0
+        self.frames_suppressed = 0
+
+    def speech_band_fraction(self, data):
+        """Fraction of spectral energy between 300 and 3400 Hz."""
+        samples = np.frombuffer(data, dtype=np.int16)
+        spectrum = np.abs(np.fft.rfft(samples))
+        if self._band_mask is None or len(self._band_mask) != len(spectrum):
+            freqs = np.fft.rfftfreq(len(samples), 1.0 / self.rate)
+            self._band_mask = (freqs >= 300) & (freqs <= 3400)
+        power = spectrum * spectrum
+        total = float(power.sum())
+        if total <= 0:
+            return 0.0
+        return float(power[self._band_mask].sum()) / total
+
+    def classify(self, data):
+        """True if this chunk looks like speech."""
+        rms = self.features.analyze(data).rms
+        if not self.is_speech or self.open_chunks >= self.max_open_chunks:
+            self.recent_levels.append(rms)
+        loud = rms > max(self.min_rms, self.noise_floor * self.threshold_ratio)
+
+        # Only pay for the FFT when the energy test passes
+        speech = loud and self.speech_band_fraction(data) >= self.band_ratio
+        if not speech:
+            # Let the noise floor drift towards it: down quickly, up slowly (a clatter is brief)
+            rate = self.noise_adapt if rms < self.noise_floor else self.noise_adapt * 0.2
+            self.noise_floor += (rms - self.noise_floor) * rate
+
+        # Nothing heard with the gate closed lately was quieter than this: that's the noise bed
+        if len(self.recent_levels) == self.recent_levels.maxlen:
+            self.noise_floor = max(self.noise_floor, min(self.recent_levels))
+        return speech
+
+    def process(self, data):
+        """
+        Feed one mic chunk. Returns the list of chunks to upload now
+        (empty while the gate is closed; pre-roll + chunk when it opens).
+        """
+        if self.classify(data):
+            self.hangover = self.hangover_chunks
+            self.last_speech_at = time.time()
+        elif self.hangover > 0:
+            self.hangover -= 1
+
+        if self.hangover > 0:
+            if not self.is_speech:
+                self.is_speech = True
+                self.speech_started_at = time.time()
+                self.open_chunks = 0
+            self.open_chunks += 1
+            out = list(self.preroll)
+            out.append(data)
+            self.preroll.clear()
+            self.frames_sent += len(out)
+            self.frames_suppressed -= len(out) - 1  # Pre-roll chunks were counted as suppressed
+            return out
+
+        if self.is_speech:
+            self.is_speech = False
+            self.speech_ended_at = self.last_speech_at
+        self.preroll.append(data)
+        self.frames_suppressed += 1
+        return []
+
+    def get_stats(self):
+        return {
+            "sent": self.frames_sent,
+            "suppressed": self.frames_suppressed,
+            "noise_floor": self.noise_floor,
+            "speaking": self.is_speech,
+        }
+
+
+class BargeInDetector:
+    """
+    Decides when the user starts talking over the robot.
+
+    Only armed while the speaker is playing. Needs `min_chunks` consecutive mic
+    chunks above `threshold` RMS so a cough or a clap doesn't cut the robot off;
+    the threshold has to sit above the robot's own voice leaking into the mic.
+    Fires once per reply, re-arms when playback stops.
+    """
+
+    def __init__(self, threshold=2000.0, min_chunks=2):
+        self.threshold = threshold
+        self.min_chunks = min_chunks
+        self.loud_chunks = 0
+        self.fired = False
+
+    def update(self, level, playing):
+        """Feed one mic chunk's RMS. Returns True when the user barges in."""
+        if not playing:
+            self.loud_chunks = 0
+            self.fired = False
+            return False
+        if self.fired:
+            return False
+
+        self.loud_chunks = self.loud_chunks + 1 if level > self.threshold else 0
+        if self.loud_chunks >= self.min_chunks:
+            self.fired = True
+            return True
+        return False
@@ -1,32 +1,54 @@
-# modules/vision.py
 import cv2
 import time
 import numpy as np
+import config
+from modules.camera import FrameGrabber
+from modules.detectors import create_detector
+from modules.detect_worker import ProcessDetector
 
 
 class VisionSystem:
-    def __init__(self):
+    def __init__(self, capture=None, threaded=True):
         # Initialize Camera
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        if capture is None:
+            capture = cv2.VideoCapture(config.CAMERA_INDEX)
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, config.CAMERA_WIDTH)
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, config.CAMERA_HEIGHT)
+        self.cap = capture
 
-        # Load Standard Face Detector (Haar Cascade)
-        # This is built-in to OpenCV, no extra downloads usually needed
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        # One thread owns the camera; everyone else reads the latest ring slot
+        # (threaded=False: track_face() grabs its own frame - used by the benchmarks)
+        self.threaded = threaded
+        self.grabber = FrameGrabber(self.cap, config.CAMERA_WIDTH, config.CAMERA_HEIGHT, config.CAMERA_RING_SIZE)
+        if threaded:
+            self.grabber.start()
+
+        # Face Detector backend (Haar / LBP / YuNet) picked in config.py,
+        # optionally in a worker process so detection doesn't hold our GIL
+        if config.FACE_DETECT_PROCESS:
+            self.detector = ProcessDetector(config.FACE_DETECTOR, config.FACE_WORKER_TIMEOUT,
+                                            config.FACE_WORKER_RESTART_DELAY)
+        else:
+            self.detector = create_detector()
 
         # State
-        self.last_frame_time = 0
-        self.frame_interval = 0.1  # Check for face 10 times a second (Fast enough for eyes)
+        self.last_frame_index = -1  # Last frame we ran detection on
         self.current_face_offset = (0, 0)  # (x, y) from -1.0 to 1.0
+        self.current_face_box = None  # (x, y, w, h) in frame pixels
+
+        # Hybrid Tracking (Detect once, then follow cheaply)
+        self.track_mode = config.FACE_TRACK_MODE
+        self.track_template = None  # Small grayscale patch of the face
+        self.track_scale = 1.0  # Template/ROI downscale factor
+        self.frames_since_detect = 0
 
-    def get_frame_bytes(self):
-        """For sending to Gemini API (Slow, 1fps)"""
-        # (Existing code for Gemini image sending...)
-        ret, frame = self.cap.read()
-        if not ret: return None
-        _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 50])
-        return buffer.tobytes()
+        # Per-stage cost of the last track_face() call (seconds)
+        self.timings = {"capture": 0.0, "gray": 0.0, "detect": 0.0, "normalize": 0.0}
+        self.last_stage = None  # "detect", "track", or None if the last call had no new frame (timings not updated)
+
+    def get_latest_frame(self):
+        """Returns (frame, frame_index, timestamp) without touching the camera."""
+        return self.grabber.latest()
 
     def track_face(self):
         """
@@ -35,41 +57,126 @@ class VisionSystem:
         y: -1.0 (Up) to 1.0 (Down)
         Returns None if no face found.
         """
-        if time.time() - self.last_frame_time < self.frame_interval:
-            return self.current_face_offset
+        t0 = time.perf_counter()
+        if not self.threaded:
+            self.grabber.grab()
+        frame, index, _ = self.grabber.latest()
+        self.last_stage = None
+        if frame is None: return (0, 0)
 
-        self.last_frame_time = time.time()
-        ret, frame = self.cap.read()
-        if not ret: return (0, 0)
+        # Same frame as last time? Nothing new to look at.
+        if index == self.last_frame_index:
+            return self.current_face_offset
+        self.last_frame_index = index
+        t1 = time.perf_counter()
 
         # Convert to grayscale for detection
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        t2 = time.perf_counter()
 
-        # Detect faces
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+        box = None
+        self.last_stage = "track"
+        if (self.track_mode == "hybrid" and self.current_face_box is not None
+                and self.frames_since_detect < config.FACE_REDETECT_INTERVAL):
+            # Cheap path: follow the face inside a small ROI
+            box = self.follow_face(gray)
+            self.frames_since_detect += 1
 
-        if len(faces) > 0:
-            # Find the biggest face (closest person)
-            # Face format: (x, y, w, h)
-            largest_face = max(faces, key=lambda f: f[2] * f[3])
-            (x, y, w, h) = largest_face
+        if box is None:
+            # Expensive path: full detector (periodic, or target lost)
+            box = self.detect_face(frame, gray)
+            self.last_stage = "detect"
+            self.frames_since_detect = 0
+            if box is not None and self.track_mode == "hybrid":
+                self.start_tracking(gray, box)
 
-            # Calculate Center
-            face_cx = x + w // 2
-            face_cy = y + h // 2
+        t3 = time.perf_counter()
 
-            # Normalize to -1.0 to 1.0 relative to screen center
-            # 320 is half of 640 width, 240 is half of 480 height
-            norm_x = (face_cx - 320) / 320.0
-            norm_y = (face_cy - 240) / 240.0
-
-            # Invert X because camera is mirrored? Usually needed.
-            self.current_face_offset = (-norm_x, norm_y)
+        self.current_face_box = box
+        if box is not None:
+            self.current_face_offset = self.normalize_box(box, frame.shape)
         else:
             # If no face, return None to indicate "Lost target"
             self.current_face_offset = None
 
+        t4 = time.perf_counter()
+        timings = self.timings
+        timings["capture"] = t1 - t0
+        timings["gray"] = t2 - t1
+        timings["detect"] = t3 - t2
+        timings["normalize"] = t4 - t3
+
         return self.current_face_offset
 
+    def detect_face(self, frame, gray):
+        """Runs the detector. Returns the biggest face (x, y, w, h) or None."""
+        faces = self.detector.detect(frame, gray)
+        if len(faces) == 0:
+            return None
+
+        # Find the biggest face (closest person)
+        # Face format: (x, y, w, h)
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        return (int(x), int(y), int(w), int(h))
+
+    def start_tracking(self, gray, box):
+        """Grabs a small template of the detected face to follow between detections."""
+        x, y, w, h = box
+        self.track_scale = min(1.0, config.FACE_TRACK_TEMPLATE_SIZE / float(max(w, h)))
+        patch = gray[y:y + h, x:x + w]
+        self.track_template = cv2.resize(patch, None, fx=self.track_scale, fy=self.track_scale,
+                                         interpolation=cv2.INTER_AREA)
+
+    def follow_face(self, gray):
+        """
+        Template-matches the last face inside a padded ROI around the last box.
+        Returns the new box, or None if the match is too weak (target lost).
+        """
+        if self.track_template is None:
+            return None
+
+        x, y, w, h = self.current_face_box
+        pad_x = int(w * config.FACE_ROI_PADDING)
+        pad_y = int(h * config.FACE_ROI_PADDING)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(gray.shape[1], x + w + pad_x), min(gray.shape[0], y + h + pad_y)
+
+        s = self.track_scale
+        roi = cv2.resize(gray[y0:y1, x0:x1], None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+        th, tw = self.track_template.shape[:2]
+        if roi.shape[0] < th or roi.shape[1] < tw:
+            return None  # Face hit the frame edge; let the cascade re-acquire
+
+        result = cv2.matchTemplate(roi, self.track_template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(result)
+        if score < config.FACE_TRACK_MIN_SCORE:
+            return None
+
+        return (x0 + int(loc[0] / s), y0 + int(loc[1] / s), w, h)
+
+    def normalize_box(self, box, shape):
+        """Face box -> (x, y) offset from -1.0 to 1.0 relative to frame center."""
+        (x, y, w, h) = box
+
+        # Calculate Center
+        face_cx = x + w // 2
+        face_cy = y + h // 2
+
+        half_w = shape[1] / 2.0
+        half_h = shape[0] / 2.0
+        norm_x = (face_cx - half_w) / half_w
+        norm_y = (face_cy - half_h) / half_h
+
+        # Invert X because camera is mirrored? Usually needed.
+        return (-norm_x, norm_y)
+
+    def get_detector_stats(self):
+        if isinstance(self.detector, ProcessDetector):
+            return self.detector.get_stats()
+        return {}
+
     def release(self):
-        self.cap.release()
\ No newline at end of file
+        self.grabber.stop()
+        self.cap.release()
+        if isinstance(self.detector, ProcessDetector):
+            self.detector.close()